@@ -1,10 +1,26 @@
 import streamlit as st
-import qrcode
 from io import BytesIO
 import base64
 from PIL import Image
 import urllib.parse
 
+from ae_portal.debug_panel import show_timings
+from ae_portal.instrumentation import current_profiler, end_profiler, profiling_requested, start_profiler
+from ae_portal.qr import (
+    DEFAULT_BASE_URL,
+    ERROR_CORRECTION_LEVELS,
+    QR_FORMATS,
+    build_qr_url,
+    cached_qr_image,
+    qr_cache,
+    render_settings,
+)
+from ae_portal.popularity import get_selection_tracker
+from ae_portal.repository import refresh_repository
+from ae_portal.results import get_result_cache
+from ae_portal.search import get_search_index
+from ae_portal.selection import canonical_selection
+
 # Configure page
 st.set_page_config(
     page_title="AE Selection Portal",
@@ -14,38 +30,45 @@ st.set_page_config(
 )
 
 
-def generate_qr_code(selected_aes):
-    """Generate QR code for the selected AEs"""
+def generate_qr_code(selected_aes, settings=None):
+    """Generate QR code for the selected AEs
+
+    Returns a PNG buffer, or the SVG markup when settings ask for SVG.
+    """
     # Get the current app URL dynamically
     import os
     
-    base_url = "https://qrapp-k6zbn7z9mh.streamlit.app/Page_2"
+    base_url = DEFAULT_BASE_URL
 
-    # Create the URL for page 2 with selected AEs as query parameters
-    ae_params = "&".join([f"ae={ae}" for ae in selected_aes])
-    full_url = f"{base_url}?{ae_params}"
-    
-    # Generate QR code
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(full_url)
-    qr.make(fit=True)
-    
-    # Create QR code image
-    qr_image = qr.make_image(fill_color="black", back_color="white")
-    st.text(full_url)
-    # Convert to bytes for display
-    buffer = BytesIO()
-    qr_image.save(buffer, format='PNG')
-    buffer.seek(0)
-    
-    return buffer
+    with current_profiler().section("generate_qr_code") as section:
+        # Canonicalize so the same selection always maps to the same URL and cache entry
+        selection = canonical_selection(selected_aes)
+
+        # Create the URL for page 2 with the selection packed into one compact token
+        full_url = build_qr_url(selection, base_url)
+        st.text(full_url)
+
+        # Generate QR code (encoded images are cached process-wide per selection and settings)
+        settings = settings or render_settings()
+        image = cached_qr_image((base_url, selection), full_url, settings)
+        section.rows = len(selection)
+
+    # Scans usually follow within seconds, so start building the Page 2 result
+    # set now; it runs on the fetch pool and does not hold up this page
+    get_result_cache().prefetch(selection)
+
+    if dict(settings)["format"] == "svg":
+        return image.decode("ascii")
+    return BytesIO(image)
+
+def remember_selection():
+    """Persist the picker value so it survives the picker being rebuilt"""
+    st.session_state.selected_aes = st.session_state.ae_picker
 
 def main():
+    profiler = start_profiler("Home", profiling_requested(st.query_params))
+    refresh_repository()
+
     # Title and header
     st.title("🔍 AE Selection Portal")
     st.markdown("---")
@@ -56,15 +79,30 @@ def main():
     with col2:
         st.markdown("### Select AE IDs")
         
-        # AE IDs list
-        ae_options = ["AE-0001", "AE-0002", "AE-0003"]
-        
+        # Narrow the AE list with the precomputed RCM / ORES / past-issue index
+        search_query = st.text_input(
+            "Search AEs:",
+            placeholder="e.g. encryption, fraud, backup...",
+            help="Matches risks, controls, test steps, event descriptions and past issue keywords"
+        )
+        matching_aes = get_search_index().search(search_query)
+
+        # Keep already-selected AEs available even when they no longer match the search.
+        # Changing the options recreates the widget, so restore its value explicitly.
+        already_selected = st.session_state.get("selected_aes", [])
+        ae_options = sorted(set(matching_aes) | set(already_selected))
+        st.session_state.ae_picker = list(already_selected)
+        if search_query:
+            st.caption(f"{len(matching_aes)} AE(s) match \"{search_query}\"")
+
         # Multiselect widget
         selected_aes = st.multiselect(
             "Choose one or more AE IDs:",
             options=ae_options,
             placeholder="Select AE IDs...",
-            help="Select at least one AE ID to generate a QR code"
+            help="Select at least one AE ID to generate a QR code",
+            key="ae_picker",
+            on_change=remember_selection
         )
         
         # Display QR code if AEs are selected
@@ -73,9 +111,29 @@ def main():
             st.markdown("### 📱 QR Code")
             st.markdown("Scan this QR code to view the selected AEs:")
             
+            with st.expander("QR options"):
+                format_col, level_col, size_col = st.columns(3)
+                with format_col:
+                    qr_format = st.radio(
+                        "Format",
+                        options=QR_FORMATS,
+                        format_func=str.upper,
+                        help="SVG is smaller and skips the PNG encode step",
+                    )
+                with level_col:
+                    error_correction = st.select_slider(
+                        "Error correction",
+                        options=list(ERROR_CORRECTION_LEVELS),
+                        help="Higher levels survive more damage but need a denser code",
+                    )
+                with size_col:
+                    box_size = st.slider("Module size (px)", min_value=2, max_value=20, value=10)
+
             try:
                 # Generate QR code
-                qr_buffer = generate_qr_code(selected_aes)
+                qr_buffer = generate_qr_code(
+                    selected_aes, render_settings(qr_format, error_correction=error_correction, box_size=box_size)
+                )
                 
                 # Display QR code
                 st.image(qr_buffer, width=300, caption="Scan to view selected AEs")
@@ -85,11 +143,23 @@ def main():
                 
                 # Additional info
                 st.info("💡 Scan the QR code with your phone to navigate to the AE details page!")
+
+                with st.expander("QR cache statistics"):
+                    st.caption(
+                        f"Scanned {get_selection_tracker().recent_views(selected_aes)} time(s) in the last minute"
+                    )
+                    st.json({"qr": qr_cache.stats(), "page_2_results": get_result_cache().stats()})
                 
             except Exception as e:
                 st.error(f"Error generating QR code: {str(e)}")
         else:
             st.info("👆 Please select at least one AE ID to generate a QR code")
 
+    if profiler.enabled:
+        show_timings(profiler.finish())
+
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        end_profiler()
@@ -0,0 +1 @@
+"""Shared helpers for the AE Selection Portal pages"""
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+AMOUNT_COLUMNS = ("Gross Impact on Earnings", "CAD Equivalent")
+CATEGORY_COLUMNS = ("AE ID", "GL Account Code", "GL Account Description")
+
+TOP_EVENTS = 10
+
+
+def typed_events(events):
+    """Return ORES events with numeric amounts, parsed dates and categorical codes"""
+    typed = events.copy()
+    for column in AMOUNT_COLUMNS:
+        typed[column] = pd.to_numeric(typed[column], errors="coerce").astype("float64")
+    typed["Discover Date"] = pd.to_datetime(typed["Discover Date"], format="ISO8601", errors="coerce")
+    for column in CATEGORY_COLUMNS:
+        typed[column] = typed[column].astype("category")
+    return typed
+
+
+def _with_ratio(totals):
+    gross = totals["Gross Impact on Earnings"].to_numpy()
+    cad = totals["CAD Equivalent"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        totals["CAD / Earnings"] = np.where(gross != 0, cad / gross, np.nan)
+    return totals
+
+
+def ores_rollups(events, top_n=TOP_EVENTS):
+    """Return the ORES financial-impact rollups for a selection's events
+
+    All aggregations are vectorized groupbys over the typed frame; the result
+    is a dict of small frames plus overall totals.
+    """
+    typed = typed_events(events)
+    amounts = list(AMOUNT_COLUMNS)
+
+    by_ae = _with_ratio(typed.groupby("AE ID", observed=True)[amounts].sum().reset_index())
+    by_gl = _with_ratio(
+        typed.groupby(["GL Account Code", "GL Account Description"], observed=True)[amounts]
+        .sum()
+        .reset_index()
+        .sort_values("Gross Impact on Earnings", ascending=False, ignore_index=True)
+    )
+    month = typed["Discover Date"].dt.to_period("M").rename("Month")
+    by_month = typed.groupby(month)[amounts].sum().reset_index()
+    by_month["Month"] = by_month["Month"].dt.to_timestamp()
+    by_month = _with_ratio(by_month)
+
+    top_events = typed.nlargest(top_n, "Gross Impact on Earnings")[
+        ["Event ID", "AE ID", "Discover Date", "Summary", *amounts, "GL Account Code"]
+    ].reset_index(drop=True)
+
+    gross_total = float(typed["Gross Impact on Earnings"].sum())
+    cad_total = float(typed["CAD Equivalent"].sum())
+    return {
+        "by_ae": by_ae,
+        "by_gl": by_gl,
+        "by_month": by_month,
+        "top_events": top_events,
+        "gross_total": gross_total,
+        "cad_total": cad_total,
+        "cad_ratio": cad_total / gross_total if gross_total else float("nan"),
+        "event_count": len(typed),
+    }
@@ -0,0 +1,133 @@
+"""Headless batch QR generation for many AE selections
+
+Reads one selection per line (AE IDs separated by commas or whitespace,
+``#`` starts a comment), renders every QR code across a process pool and
+writes them to a ZIP of PNGs or a multi-page PDF.
+
+Selections that cannot be encoded inline are refused unless a selection store
+the server also reads is given (``--selection-store``, or
+``AE_SELECTION_STORE``), since their codes only resolve through that store.
+
+    python -m ae_portal.batch_qr selections.txt -o qr_codes.zip
+    python -m ae_portal.batch_qr selections.txt -o qr_codes.pdf --workers 8
+"""
+import argparse
+import csv
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from ae_portal.qr import DEFAULT_BASE_URL, build_qr_url, render_qr_png
+from ae_portal.selection import SelectionStore, canonical_selection, inline_obstacle
+
+# Height of the caption strip added under each code on PDF pages
+PDF_CAPTION_HEIGHT = 40
+
+
+def read_selections(path):
+    """Return the canonical selections listed in path, skipping blank and comment lines"""
+    selections = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                selections.append(canonical_selection(part for part in re.split(r"[,\s]+", line) if part))
+    return selections
+
+
+def _label(selection, limit=6):
+    shown = ", ".join(selection[:limit])
+    return shown if len(selection) <= limit else f"{shown} (+{len(selection) - limit} more)"
+
+
+def _write_zip(path, selections, urls, pngs):
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_STORED) as archive:
+        manifest = io.StringIO()
+        writer = csv.writer(manifest)
+        writer.writerow(["file", "url", "ae_ids"])
+        for number, (selection, url, png) in enumerate(zip(selections, urls, pngs), 1):
+            name = f"qr_{number:05d}.png"
+            # PNGs are already deflate-compressed; storing them avoids a second pass
+            archive.writestr(name, png)
+            writer.writerow([name, url, " ".join(selection)])
+        archive.writestr("manifest.csv", manifest.getvalue())
+
+
+def _write_pdf(path, selections, pngs):
+    pages = []
+    for selection, png in zip(selections, pngs):
+        code = Image.open(io.BytesIO(png)).convert("L")
+        page = Image.new("L", (code.width, code.height + PDF_CAPTION_HEIGHT), 255)
+        page.paste(code, (0, 0))
+        ImageDraw.Draw(page).text((10, code.height + 10), _label(selection), fill=0)
+        pages.append(page.convert("1"))
+    pages[0].save(path, format="PDF", save_all=True, append_images=pages[1:], resolution=150)
+
+
+def generate_batch(selections, output, base_url=DEFAULT_BASE_URL, workers=None, store=None):
+    """Render QR codes for selections into output (.zip or .pdf); return codes per second
+
+    Selections that do not fit inline are written to store, which must be
+    the selection store the server reads; without one they raise ValueError.
+    """
+    if store is None:
+        obstacles = [(number, inline_obstacle(selection)) for number, selection in enumerate(selections, 1)]
+        stored = [(number, obstacle) for number, obstacle in obstacles if obstacle is not None]
+        if stored:
+            number, obstacle = stored[0]
+            raise ValueError(
+                f"{len(stored)} selection(s) cannot be encoded inline (first: selection #{number}, "
+                f"because {obstacle}); pass the server's selection store with --selection-store"
+            )
+    started = time.perf_counter()
+    # URLs are built in this process so large selections land in one selection store
+    urls = [build_qr_url(selection, base_url, store) for selection in selections]
+    workers = workers or os.cpu_count() or 1
+    chunksize = max(1, len(urls) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pngs = list(pool.map(render_qr_png, urls, chunksize=chunksize))
+
+    if str(output).lower().endswith(".pdf"):
+        _write_pdf(output, selections, pngs)
+    else:
+        _write_zip(output, selections, urls, pngs)
+    elapsed = time.perf_counter() - started
+    return len(pngs) / elapsed if elapsed else float("inf")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render QR codes for many AE selections.")
+    parser.add_argument("selections", help="file with one selection per line")
+    parser.add_argument("-o", "--output", default="qr_codes.zip", help="output .zip or .pdf")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: CPU count)")
+    parser.add_argument(
+        "--selection-store",
+        default=os.environ.get("AE_SELECTION_STORE"),
+        help="selection store shared with the server, for selections too large to encode inline "
+        "(default: AE_SELECTION_STORE)",
+    )
+    args = parser.parse_args(argv)
+
+    selections = read_selections(args.selections)
+    if not selections:
+        print("No selections found.", file=sys.stderr)
+        return 1
+    store = SelectionStore(args.selection_store) if args.selection_store else None
+    try:
+        rate = generate_batch(selections, args.output, base_url=args.base_url, workers=args.workers, store=store)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 1
+    print(f"Wrote {len(selections)} QR codes to {args.output} ({rate:.1f} codes/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from ae_portal.paths import app_dir
+
+SHARED_CACHE_FILENAME = "shared_cache.sqlite"
+
+# Size budget of each namespace in the shared store
+SHARED_CACHE_MAX_BYTES = {
+    "qr": 32 * 1024 * 1024,
+    "results": 256 * 1024 * 1024,
+}
+DEFAULT_SHARED_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Rows dropped per eviction round, oldest access first
+EVICTION_BATCH = 16
+
+# Hits whose access times are held in memory before they are written
+ACCESS_BATCH = 64
+
+
+def cache_key(key):
+    """Return a stable string for a tuple key, the same in every process"""
+    return hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+
+
+class CacheBackend(ABC):
+    """Byte store behind a process-local cache, shared by several processes"""
+
+    @abstractmethod
+    def get(self, key):
+        """Return the bytes stored under key, or None"""
+
+    @abstractmethod
+    def put(self, key, value):
+        """Store value (bytes) under key"""
+
+    @abstractmethod
+    def clear(self):
+        """Drop every entry of this backend's namespace"""
+
+    @abstractmethod
+    def stats(self):
+        """Return a snapshot of the backend counters"""
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Size-bounded cache in a local SQLite file, shared by every worker on the host
+
+    Each put runs in one write transaction that also evicts least recently
+    used entries until the namespace is back under max_bytes, so readers in
+    other processes only ever see complete entries. The database runs in WAL
+    mode, and a hit does not write: access times are collected in memory and
+    written with the next put, or once ACCESS_BATCH hits have piled up, so
+    reads rarely wait on the write lock.
+    """
+
+    def __init__(self, path, namespace, max_bytes=DEFAULT_SHARED_CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._accessed = {}
+        self._accessed_lock = threading.Lock()
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, "
+                "size INTEGER NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries (namespace, accessed)")
+            conn.execute("CREATE TABLE IF NOT EXISTS usage (namespace TEXT PRIMARY KEY, bytes INTEGER NOT NULL)")
+
+    def _connect(self):
+        # One connection per thread; sqlite3 connections are not shared across threads
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        key = cache_key(key)
+        row = conn.execute("SELECT value FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with self._accessed_lock:
+            self._accessed[key] = time.time()
+            due = len(self._accessed) >= ACCESS_BATCH
+        if due:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._write_accessed(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return row[0]
+
+    def _write_accessed(self, conn):
+        """Write the batched access times, inside the caller's transaction"""
+        with self._accessed_lock:
+            accessed, self._accessed = self._accessed, {}
+        conn.executemany(
+            "UPDATE entries SET accessed = ? WHERE namespace = ? AND key = ?",
+            [(when, self.namespace, key) for key, when in accessed.items()],
+        )
+
+    def put(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        conn = self._connect()
+        key = cache_key(key)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._write_accessed(conn)
+            previous = conn.execute(
+                "SELECT size FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, sqlite3.Binary(value), size, time.time()),
+            )
+            delta = size - (previous[0] if previous else 0)
+            conn.execute(
+                "INSERT INTO usage VALUES (?, ?) ON CONFLICT(namespace) DO UPDATE SET bytes = bytes + excluded.bytes",
+                (self.namespace, delta),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn):
+        (used,) = conn.execute("SELECT bytes FROM usage WHERE namespace = ?", (self.namespace,)).fetchone()
+        while used > self.max_bytes:
+            oldest = conn.execute(
+                "SELECT key, size FROM entries WHERE namespace = ? ORDER BY accessed LIMIT ?",
+                (self.namespace, EVICTION_BATCH),
+            ).fetchall()
+            if not oldest:
+                # The usage total drifted from the rows (e.g. rows deleted by hand); nothing is left
+                used = 0
+                break
+            for key, size in oldest:
+                if used <= self.max_bytes:
+                    break
+                conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                used -= size
+                self.evictions += 1
+        conn.execute("UPDATE usage SET bytes = ? WHERE namespace = ?", (used, self.namespace))
+
+    def clear(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM entries WHERE namespace = ?", (self.namespace,))
+        conn.execute("DELETE FROM usage WHERE namespace = ?", (self.namespace,))
+        conn.execute("COMMIT")
+
+    def stats(self):
+        row = self._connect().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        return {
+            "entries": row[0],
+            "bytes": row[1],
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_cache_backend(namespace):
+    """Return the shared backend for namespace, or None for process-local caching only
+
+    Set ``AE_CACHE_BACKEND=sqlite`` to share the QR and result caches between
+    the worker processes on one host, through the SQLite file at
+    ``AE_SHARED_CACHE_PATH`` (default: in the per-user app cache directory).
+    """
+    if os.environ.get("AE_CACHE_BACKEND", "memory") != "sqlite":
+        return None
+    with _backends_lock:
+        if namespace not in _backends:
+            _backends[namespace] = SQLiteCacheBackend(
+                os.environ.get("AE_SHARED_CACHE_PATH") or app_dir("cache") / SHARED_CACHE_FILENAME,
+                namespace,
+                SHARED_CACHE_MAX_BYTES.get(namespace, DEFAULT_SHARED_CACHE_MAX_BYTES),
+            )
+        return _backends[namespace]
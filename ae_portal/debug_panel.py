@@ -0,0 +1,17 @@
+import pandas as pd
+import streamlit as st
+
+from ae_portal.instrumentation import metrics_dir
+
+
+def show_timings(records):
+    """Debug panel listing the per-section timings of this run"""
+    if not records:
+        return
+    with st.expander("⏱️ Render timings (debug)", expanded=True):
+        timings = pd.DataFrame(records)
+        timings["ms"] = timings.pop("seconds") * 1000
+        timings["allocated KiB"] = timings.pop("allocated_bytes") / 1024
+        timings["peak KiB"] = timings.pop("peak_bytes") / 1024
+        st.dataframe(timings.round(2), use_container_width=True, hide_index=True)
+        st.caption(f"Total: {timings['ms'].sum():.1f} ms. Also written to {metrics_dir()}")
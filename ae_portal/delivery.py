@@ -0,0 +1,110 @@
+import pandas as pd
+import streamlit as st
+
+from ae_portal.instrumentation import current_profiler
+
+# Characters of free text sent per cell before it is cut off with an ellipsis
+TEXT_PREVIEW_CHARS = 60
+
+# Long free-text columns left out of the compact view until asked for
+HIDDEN_COLUMNS = ("Test Steps", "Description", "Details")
+
+# Text columns whose distinct values are at most this share of the rows are
+# sent dictionary-encoded (as categoricals). Below CATEGORY_MIN_ROWS rows the
+# dictionary costs more than it saves.
+CATEGORY_MAX_RATIO = 0.5
+CATEGORY_MIN_ROWS = 50
+
+ELLIPSIS = "…"
+
+
+def compact_frame(frame, columns=None, max_chars=TEXT_PREVIEW_CHARS):
+    """Return the columns of frame as they are sent in compact mode
+
+    Long text is cut to max_chars, repeated text values become categoricals
+    (Arrow dictionary arrays), and categoricals only keep the categories
+    that occur, so a slice of a large catalogue does not ship its whole
+    dictionary.
+    """
+    columns = list(frame.columns) if columns is None else columns
+    compact = {}
+    for column in columns:
+        series = frame[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.cat.remove_unused_categories()
+        elif series.dtype == object:
+            text = series.where(series.isna(), series.astype(str))
+            long = text.str.len() > max_chars
+            if long.any():
+                text = text.where(~long, text.str.slice(0, max_chars - 1) + ELLIPSIS)
+            series = text
+            if len(series) >= CATEGORY_MIN_ROWS and series.nunique() <= CATEGORY_MAX_RATIO * len(series):
+                series = series.astype("category")
+        compact[column] = series.reset_index(drop=True)
+    return pd.DataFrame(compact)
+
+
+def payload_bytes(frame):
+    """Return the size of frame as an Arrow IPC stream, the format st.dataframe sends"""
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().size
+
+
+def compact_mode():
+    """Return True unless the user turned compact tables off for this session"""
+    return st.session_state.get("compact_tables", True)
+
+
+def show_table(frame, key, column_config=None):
+    """Render frame with st.dataframe, in compact mode when enabled
+
+    In compact mode only the chosen columns are sent, long text is truncated
+    and repeated values are dictionary-encoded. Selecting a row shows that
+    record in full, every column included. When profiling is on, the bytes
+    sent and saved are shown under the table.
+    """
+    if not compact_mode():
+        st.dataframe(frame, use_container_width=True, hide_index=True, column_config=column_config)
+        return
+
+    all_columns = list(frame.columns)
+    with st.popover("Columns"):
+        columns = st.multiselect(
+            "Visible columns",
+            options=all_columns,
+            default=[column for column in all_columns if column not in HIDDEN_COLUMNS],
+            key=f"{key}_columns",
+        )
+    compact = compact_frame(frame, columns or all_columns)
+    event = st.dataframe(
+        compact,
+        use_container_width=True,
+        hide_index=True,
+        column_config=column_config,
+        on_select="rerun",
+        selection_mode="single-row",
+        key=f"{key}_table",
+    )
+    selected = event.get("selection", {}).get("rows", []) if event else []
+    if selected:
+        # On-demand expansion: the untruncated record, hidden columns included
+        record = frame.iloc[selected[0]]
+        with st.container(border=True):
+            for column in all_columns:
+                st.markdown(f"**{column}:** {record[column]}")
+    else:
+        st.caption("Select a row to see the full record.")
+
+    if current_profiler().enabled:
+        sent = payload_bytes(compact)
+        full = payload_bytes(frame)
+        saved = full - sent
+        st.caption(
+            f"Payload: {sent / 1024:.1f} KiB sent instead of {full / 1024:.1f} KiB "
+            f"({saved / 1024:.1f} KiB, {saved / full if full else 0:.0%} saved)"
+        )
@@ -0,0 +1,94 @@
+import os
+import tempfile
+from io import BytesIO
+
+import pandas as pd
+
+# Excel's hard row limit, header row included
+EXCEL_MAX_ROWS = 1_048_576
+
+EXPORT_FORMATS = {
+    "Excel": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _cell(value):
+    # xlsxwriter cannot write NaN/NaT; leave those cells blank
+    return None if pd.isna(value) else value
+
+
+def _write_frame(workbook, sheet_name, frame):
+    """Write frame row by row, spilling onto extra sheets past the row limit"""
+    columns = list(frame.columns)
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+    part = 1
+    worksheet = None
+    row_number = rows_per_sheet
+    for row in frame.itertuples(index=False, name=None):
+        if row_number == rows_per_sheet:
+            name = sheet_name if part == 1 else f"{sheet_name} ({part})"
+            worksheet = workbook.add_worksheet(name[:31])
+            worksheet.write_row(0, 0, columns)
+            part += 1
+            row_number = 0
+        row_number += 1
+        worksheet.write_row(row_number, 0, [_cell(value) for value in row])
+    if worksheet is None:
+        workbook.add_worksheet(sheet_name[:31]).write_row(0, 0, columns)
+
+
+def export_excel(sheets):
+    """Return xlsx bytes with one sheet per (name, frame) pair
+
+    The workbook is written in xlsxwriter's constant-memory mode to a
+    temporary file, so only the finished file is ever held in memory.
+    """
+    import xlsxwriter
+
+    handle, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(handle)
+    try:
+        workbook = xlsxwriter.Workbook(path, {"constant_memory": True, "default_date_format": "yyyy-mm-dd"})
+        for name, frame in sheets:
+            _write_frame(workbook, name, frame)
+        workbook.close()
+        with open(path, "rb") as file:
+            return file.read()
+    finally:
+        os.remove(path)
+
+
+def export_csv(frame):
+    """Return the frame as UTF-8 CSV bytes"""
+    buffer = BytesIO()
+    frame.to_csv(buffer, index=False, encoding="utf-8", chunksize=50_000)
+    return buffer.getvalue()
+
+
+def export_parquet(frame):
+    """Return the frame as Parquet bytes"""
+    buffer = BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def export_historical(results, historical, export_format):
+    """Return (bytes, file_name, mime) for a Page_2 result set in export_format"""
+    extension, mime = EXPORT_FORMATS[export_format]
+    if export_format == "Excel":
+        data = export_excel(
+            [
+                ("Historical Data", historical),
+                ("RCM", results["rcm"]),
+                ("Related Events", results["ores"]),
+                ("Prior Audits", results["audits"]),
+                ("Prior Issues", results["issues"]),
+            ]
+        )
+    elif export_format == "CSV":
+        data = export_csv(historical)
+    else:
+        data = export_parquet(historical)
+    return data, f"historical_data.{extension}", mime
@@ -0,0 +1,214 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from ae_portal.paths import app_dir
+
+METRICS_DIRNAME = "metrics"
+
+# Truthy values of the AE_PORTAL_PROFILE environment variable / ?debug= query param
+_ENABLED_VALUES = {"1", "true", "yes", "on"}
+
+
+def profiling_requested(query_params=None):
+    """Return True when profiling is switched on by env var or ``?debug=1``"""
+    if os.environ.get("AE_PORTAL_PROFILE", "").lower() in _ENABLED_VALUES:
+        return True
+    if query_params is not None and "debug" in query_params:
+        return str(query_params["debug"]).lower() in _ENABLED_VALUES
+    return False
+
+
+def metrics_dir():
+    """Return the metrics output directory (``AE_PORTAL_METRICS_DIR`` overrides the default)"""
+    override = os.environ.get("AE_PORTAL_METRICS_DIR")
+    return Path(override) if override else app_dir("cache") / METRICS_DIRNAME
+
+
+class _NullSection:
+    """Section stand-in used when profiling is off; every operation is a no-op"""
+
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_SECTION = _NullSection()
+
+
+class NullProfiler:
+    enabled = False
+    records = ()
+
+    def section(self, name):
+        return _NULL_SECTION
+
+    def finish(self):
+        return ()
+
+    def abandon(self):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Section:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.rows = None
+
+    def __enter__(self):
+        tracemalloc.reset_peak()
+        self._memory = tracemalloc.get_traced_memory()[0]
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        seconds = time.perf_counter() - self._started
+        current, peak = tracemalloc.get_traced_memory()
+        self.profiler.records.append(
+            {
+                "section": self.name,
+                "seconds": seconds,
+                "rows": None if self.rows is None else int(self.rows),
+                "allocated_bytes": max(0, current - self._memory),
+                "peak_bytes": max(0, peak - self._memory),
+            }
+        )
+        return False
+
+
+# tracemalloc is process-wide; it runs while at least one profiled script run is active
+_tracing_users = 0
+_tracing_lock = threading.Lock()
+
+
+def _acquire_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _release_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+
+class Profiler:
+    """Records wall time, row counts and net allocated bytes per page section"""
+
+    enabled = True
+
+    def __init__(self, page):
+        self.page = page
+        self.records = []
+        self.started_at = time.time()
+        self._finished = False
+        _acquire_tracing()
+
+    def section(self, name):
+        # Fragment reruns after finish() are not part of this run's report
+        if self._finished:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def finish(self):
+        """Stop tracing and write the run to the metrics files; return the records"""
+        if not self._finished:
+            self._finished = True
+            _release_tracing()
+            _metrics_writer.write(self)
+        return self.records
+
+    def abandon(self):
+        """Stop tracing without writing; for runs interrupted before finish()"""
+        if not self._finished:
+            self._finished = True
+            _release_tracing()
+
+
+class MetricsWriter:
+    """Appends runs to a JSON-lines log and keeps a Prometheus textfile up to date"""
+
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def write(self, profiler):
+        directory = metrics_dir()
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        line = json.dumps({"page": profiler.page, "started_at": profiler.started_at, "sections": profiler.records})
+        with self._lock:
+            with open(directory / "page_timings.jsonl", "a", encoding="utf-8") as log:
+                log.write(line + "\n")
+            for record in profiler.records:
+                key = (profiler.page, record["section"])
+                total = self._totals.setdefault(key, {"count": 0, "seconds": 0.0, "rows": 0, "bytes": 0})
+                total["count"] += 1
+                total["seconds"] += record["seconds"]
+                total["rows"] += record["rows"] or 0
+                total["bytes"] += record["allocated_bytes"]
+            self._write_prometheus(directory / "ae_portal.prom")
+
+    def _write_prometheus(self, path):
+        metrics = (
+            ("ae_portal_section_seconds_total", "counter", "Wall time spent rendering a section", "seconds"),
+            ("ae_portal_section_runs_total", "counter", "Number of times a section was rendered", "count"),
+            ("ae_portal_section_rows_total", "counter", "Rows produced by a section", "rows"),
+            ("ae_portal_section_allocated_bytes_total", "counter", "Net bytes allocated by a section", "bytes"),
+        )
+        lines = []
+        for name, kind, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (page, section), total in sorted(self._totals.items()):
+                lines.append(f'{name}{{page="{page}",section="{section}"}} {total[field]}')
+        # Replace atomically so a scraping node exporter never reads a partial file
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        os.replace(temporary, path)
+
+
+_metrics_writer = MetricsWriter()
+_local = threading.local()
+
+
+def start_profiler(page, enabled):
+    """Begin profiling a script run on this thread; returns the active profiler"""
+    # A rerun or st.switch_page can interrupt the previous run before finish()
+    current_profiler().abandon()
+    _local.profiler = Profiler(page) if enabled else NULL_PROFILER
+    return _local.profiler
+
+
+def end_profiler():
+    """Release the profiler of this thread's script run, finished or not
+
+    Pages call this in a ``finally`` around their run: Streamlit may start the
+    next run on another thread, so an exception, st.stop() or a disconnect
+    would otherwise leave tracemalloc running for the whole process.
+    """
+    current_profiler().abandon()
+    _local.profiler = NULL_PROFILER
+
+
+def current_profiler():
+    """Return the profiler of the script run on this thread (a no-op one if none)"""
+    return getattr(_local, "profiler", NULL_PROFILER)
@@ -0,0 +1,34 @@
+import os
+import stat
+import sys
+from pathlib import Path
+
+APP_NAME = "ae_portal"
+
+
+def _base_dir(kind):
+    if sys.platform == "win32":
+        return Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    if kind == "cache":
+        return Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share"))
+
+
+def app_dir(kind):
+    """Return the per-user app directory for kind ("cache" or "data"), private to this user
+
+    Unlike the shared system temp dir, no other local user can create or
+    replace files in it. Raises PermissionError if the directory exists but
+    belongs to someone else.
+    """
+    path = _base_dir(kind) / APP_NAME
+    if kind == "cache" and sys.platform == "win32":
+        path = path / "cache"
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if hasattr(os, "getuid"):
+        info = path.stat()
+        if info.st_uid != os.getuid():
+            raise PermissionError(f"{path} is not owned by the current user")
+        if stat.S_IMODE(info.st_mode) & 0o077:
+            path.chmod(0o700)
+    return path
@@ -0,0 +1,172 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from pathlib import Path
+
+from ae_portal.paths import app_dir
+from ae_portal.selection import canonical_selection
+
+POPULARITY_LOG_FILENAME = "popularity.sqlite"
+
+# Views older than this no longer count towards a selection's popularity
+POPULARITY_WINDOW_SECONDS = 30 * 24 * 60 * 60
+
+# Tracked views are written to the log in batches, at most this often
+FLUSH_INTERVAL_SECONDS = 30
+
+# Window of the in-memory recent-view counts that show a burst of scans
+BURST_WINDOW_SECONDS = 60
+
+
+class PopularityLog:
+    """Local SQLite log of how often each canonical selection is opened
+
+    One row per selection, holding its view count and when it was last seen,
+    so the log stays small however much traffic it records. It is shared by
+    every process on the host.
+    """
+
+    def __init__(self, path, window=POPULARITY_WINDOW_SECONDS):
+        self.path = Path(path)
+        self.window = window
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS selection_views ("
+                "ids TEXT PRIMARY KEY, views INTEGER NOT NULL, last_seen REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def record(self, selected_aes, views=1):
+        """Count views more openings of selected_aes"""
+        self.record_many({canonical_selection(selected_aes): views})
+
+    def record_many(self, counts):
+        """Add {selection: views} to the log in one transaction"""
+        now = time.time()
+        rows = [("\n".join(selection), views, now) for selection, views in counts.items() if selection and views]
+        if not rows:
+            return
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT INTO selection_views VALUES (?, ?, ?) "
+                "ON CONFLICT(ids) DO UPDATE SET views = views + excluded.views, last_seen = excluded.last_seen",
+                rows,
+            )
+
+    def top(self, limit):
+        """Return the limit most viewed selections seen within the window, most popular first"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT ids, views FROM selection_views WHERE last_seen >= ? "
+                "ORDER BY views DESC, last_seen DESC LIMIT ?",
+                (time.time() - self.window, limit),
+            ).fetchall()
+        return [(tuple(ids.split("\n")), views) for ids, views in rows]
+
+
+class SelectionTracker:
+    """In-process selection view counter in front of a PopularityLog
+
+    record() only updates memory, so it is cheap enough to call on every
+    Page 2 view; counts are written to the log in one batch every
+    flush_interval seconds (and at exit). recent_views() counts the views of
+    the last window seconds, which is how a room full of phones scanning the
+    same code shows up.
+    """
+
+    def __init__(self, log, flush_interval=FLUSH_INTERVAL_SECONDS, window=BURST_WINDOW_SECONDS):
+        self.log = log
+        self.flush_interval = flush_interval
+        self.window = window
+        self._pending = Counter()
+        self._recent = defaultdict(deque)
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _trim(self, views, now):
+        while views and views[0] < now - self.window:
+            views.popleft()
+
+    def record(self, selected_aes):
+        """Count one view of selected_aes"""
+        selection = canonical_selection(selected_aes)
+        if not selection:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._pending[selection] += 1
+            views = self._recent[selection]
+            views.append(now)
+            self._trim(views, now)
+            due = now - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def recent_views(self, selected_aes):
+        """Return how many views selected_aes had within the window"""
+        now = time.monotonic()
+        with self._lock:
+            views = self._recent.get(canonical_selection(selected_aes))
+            if not views:
+                return 0
+            self._trim(views, now)
+            return len(views)
+
+    def hot(self, limit):
+        """Return the limit selections with the most recent views, as (selection, views)"""
+        now = time.monotonic()
+        with self._lock:
+            for views in self._recent.values():
+                self._trim(views, now)
+            counts = [(selection, len(views)) for selection, views in self._recent.items() if views]
+        return sorted(counts, key=lambda item: item[1], reverse=True)[:limit]
+
+    def flush(self):
+        """Write the views counted since the last flush to the log"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+            for selection in [selection for selection, views in self._recent.items() if not views]:
+                del self._recent[selection]
+        self.log.record_many(pending)
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_popularity_log():
+    """Return the process-wide popularity log
+
+    The database lives in the per-user app data directory; set
+    ``AE_POPULARITY_LOG`` to move it.
+    """
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = PopularityLog(
+                    os.environ.get("AE_POPULARITY_LOG") or app_dir("data") / POPULARITY_LOG_FILENAME
+                )
+    return _log
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_selection_tracker():
+    """Return the process-wide tracker writing to the popularity log"""
+    global _tracker
+    if _tracker is None:
+        with _tracker_lock:
+            if _tracker is None:
+                _tracker = SelectionTracker(get_popularity_log())
+                atexit.register(_tracker.flush)
+    return _tracker
@@ -0,0 +1,102 @@
+"""Server entry point that prewarms the app before accepting traffic
+
+Loads the AE data and its indexes, builds the search index, imports the
+libraries the pages load lazily, and warms the QR, result and word cloud
+caches for the most popular selections in the popularity log. Only then is
+the Streamlit server started, in the same process, so the first request
+after a deploy or restart finds everything warm.
+
+    python -m ae_portal.prewarm                      # prewarm, then serve Home.py
+    python -m ae_portal.prewarm --top 50 -- --server.port 8502
+    python -m ae_portal.prewarm --no-serve           # prewarm and report only
+"""
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+from ae_portal.popularity import get_popularity_log
+from ae_portal.qr import DEFAULT_BASE_URL, build_qr_url, cached_qr_image
+from ae_portal.repository import get_repository
+from ae_portal.results import get_result_cache
+from ae_portal.search import get_search_index
+from ae_portal.wordclouds import wordcloud_png
+
+HOME_SCRIPT = Path(__file__).resolve().parent.parent / "Home.py"
+
+# Selections from the popularity log warmed at start
+DEFAULT_PREWARM_SELECTIONS = 20
+
+# Modules the pages import lazily, loaded here so no request pays for them
+PREWARM_MODULES = ("pyarrow", "plotly.express", "wordcloud")
+
+
+def prewarm(top=DEFAULT_PREWARM_SELECTIONS, base_url=DEFAULT_BASE_URL):
+    """Warm every process-wide cache; return {stage: seconds} plus counts"""
+    report = {}
+
+    def stage(name, function):
+        started = time.perf_counter()
+        result = function()
+        report[name] = round(time.perf_counter() - started, 3)
+        return result
+
+    def import_modules():
+        for module in PREWARM_MODULES:
+            try:
+                importlib.import_module(module)
+            except ImportError:
+                pass
+
+    stage("imports", import_modules)
+    repository = stage("repository", get_repository)
+    stage("search_index", get_search_index)
+    selections = stage("popularity_log", lambda: [selection for selection, _ in get_popularity_log().top(top)])
+
+    result_cache = get_result_cache()
+    stage("result_sets", lambda: [result_cache.get(selection) for selection in selections])
+    # Same cache key as Home's generate_qr_code, so those renders are hits
+    stage(
+        "qr_codes",
+        lambda: [cached_qr_image((base_url, selection), build_qr_url(selection, base_url)) for selection in selections],
+    )
+    popular_aes = sorted({ae for selection in selections for ae in selection})
+    stage("wordclouds", lambda: [wordcloud_png(repository, ae) for ae in popular_aes])
+
+    report["selections"] = len(selections)
+    report["ae_count"] = len(repository.ae_ids())
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prewarm the AE portal caches, then start the server.")
+    parser.add_argument("--top", type=int, default=DEFAULT_PREWARM_SELECTIONS, help="popular selections to warm")
+    parser.add_argument("--base-url", default=DEFAULT_BASE_URL)
+    parser.add_argument("--no-serve", action="store_true", help="prewarm and report, without starting the server")
+    parser.add_argument("--ready-file", help="file touched once the caches are warm")
+    parser.add_argument("streamlit_args", nargs="*", help="extra arguments for `streamlit run`, after --")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    report = prewarm(top=args.top, base_url=args.base_url)
+    stages = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in report.items() if isinstance(seconds, float))
+    print(
+        f"Ready in {time.perf_counter() - started:.2f}s: {report['ae_count']} AEs, "
+        f"{report['selections']} popular selections warmed ({stages})",
+        flush=True,
+    )
+    if args.ready_file:
+        Path(args.ready_file).touch()
+    if args.no_serve:
+        return 0
+
+    # Run the CLI in this process so the server shares the warm module-level caches
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", str(HOME_SCRIPT), *args.streamlit_args]
+    return cli.main()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import qrcode
+
+from ae_portal.cache_backends import get_cache_backend
+from ae_portal.selection import encode_selection
+
+# Page 2 address that QR codes point at
+DEFAULT_BASE_URL = "https://qrapp-k6zbn7z9mh.streamlit.app/Page_2"
+
+# Upper bound on the total size of encoded images held by the process-wide cache
+QR_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Output formats: PNG is rasterized by PIL, SVG is written directly from the module matrix
+QR_FORMATS = ("png", "svg")
+
+ERROR_CORRECTION_LEVELS = {
+    "L": qrcode.constants.ERROR_CORRECT_L,
+    "M": qrcode.constants.ERROR_CORRECT_M,
+    "Q": qrcode.constants.ERROR_CORRECT_Q,
+    "H": qrcode.constants.ERROR_CORRECT_H,
+}
+
+
+def render_settings(format="png", error_correction="L", box_size=10, border=4, fill_color="black", back_color="white"):
+    """Return a hashable render settings tuple, usable as part of a cache key
+
+    error_correction is one of the ERROR_CORRECTION_LEVELS letters and
+    box_size the size of one module in pixels.
+    """
+    if format not in QR_FORMATS:
+        raise ValueError(f"Unknown QR format: {format}")
+    return (
+        ("format", format),
+        ("error_correction", ERROR_CORRECTION_LEVELS[error_correction]),
+        ("box_size", int(box_size)),
+        ("border", int(border)),
+        ("fill_color", fill_color),
+        ("back_color", back_color),
+    )
+
+
+DEFAULT_RENDER_SETTINGS = render_settings()
+
+
+class QRImageCache:
+    """Thread-safe LRU cache of encoded QR images (PNG or SVG bytes) bounded by total size
+
+    backend is an optional CacheBackend shared with other worker processes:
+    local misses are looked up there before rendering, and every new image
+    is written through to it.
+    """
+
+    def __init__(self, max_bytes=QR_CACHE_MAX_BYTES, backend=None):
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.current_bytes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return png
+        png = self.backend.get(key) if self.backend is not None else None
+        if png is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.shared_hits += 1
+        self._put_local(key, png)
+        return png
+
+    def put(self, key, png):
+        self._put_local(key, png)
+        if self.backend is not None:
+            self.backend.put(key, png)
+
+    def _put_local(self, key, png):
+        size = len(png)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = png
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            stats = {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+            }
+        if self.backend is not None:
+            stats["shared"] = self.backend.stats()
+        return stats
+
+
+qr_cache = QRImageCache(backend=get_cache_backend("qr"))
+
+
+def build_qr_url(selection, base_url=DEFAULT_BASE_URL, store=None):
+    """Return the Page 2 URL for a canonical selection
+
+    store is the SelectionStore that selections too large to encode inline
+    go to (default: the process-wide store).
+    """
+    return f"{base_url}?s={encode_selection(selection, store)}"
+
+
+def _make_qr(data, options):
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=options["error_correction"],
+        box_size=options["box_size"],
+        border=options["border"],
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr
+
+
+def render_qr_png(data, settings=DEFAULT_RENDER_SETTINGS):
+    """Render the QR code for data and return the encoded PNG bytes"""
+    options = dict(settings)
+    qr_image = _make_qr(data, options).make_image(fill_color=options["fill_color"], back_color=options["back_color"])
+    buffer = BytesIO()
+    qr_image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def render_qr_svg(data, settings=DEFAULT_RENDER_SETTINGS):
+    """Render the QR code for data and return SVG bytes
+
+    Each row is one stroked path segment per run of dark modules, with
+    relative moves between runs, in module units scaled by the viewBox. There
+    is no raster or PIL encode step.
+    """
+    options = dict(settings)
+    matrix = _make_qr(data, options).get_matrix()
+    size = len(matrix)
+    path = []
+    for y, row in enumerate(matrix):
+        x = 0
+        pen = None
+        while x < size:
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < size and row[x]:
+                x += 1
+            # Strokes are centred on the path, so each row is drawn at y + 0.5
+            path.append(f"M{start} {y}.5h{x - start}" if pen is None else f"m{start - pen} 0h{x - start}")
+            pen = x
+    pixels = size * options["box_size"]
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="{options["back_color"]}"/>'
+        f'<path stroke="{options["fill_color"]}" d="{"".join(path)}"/></svg>'
+    ).encode("ascii")
+
+
+def render_qr(data, settings=DEFAULT_RENDER_SETTINGS):
+    """Render the QR code for data in the format named by settings"""
+    if dict(settings).get("format", "png") == "svg":
+        return render_qr_svg(data, settings)
+    return render_qr_png(data, settings)
+
+
+def cached_qr_image(selection_key, data, settings=DEFAULT_RENDER_SETTINGS, cache=qr_cache):
+    """Return the encoded QR image for data, rendering only on a cache miss"""
+    key = (selection_key, settings)
+    image = cache.get(key)
+    if image is None:
+        image = render_qr(data, settings)
+        cache.put(key, image)
+    return image
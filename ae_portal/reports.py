@@ -0,0 +1,168 @@
+import html
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from ae_portal.repository import get_repository
+from ae_portal.results import get_result_cache
+from ae_portal.selection import canonical_selection
+
+REPORT_WORKERS = 2
+
+# Finished reports kept in memory, keyed by selection and dataset version
+MAX_CACHED_REPORTS = 32
+
+REPORT_STYLE = """
+body { font-family: -apple-system, "Segoe UI", Roboto, sans-serif; margin: 32px; color: #222; }
+h1 { margin-bottom: 0; }
+.meta { color: #666; margin-bottom: 24px; }
+table { border-collapse: collapse; width: 100%; margin-bottom: 24px; font-size: 13px; }
+th, td { border: 1px solid #ddd; padding: 6px 8px; text-align: left; vertical-align: top; white-space: pre-line; }
+th { background: #f4f4f4; }
+.metrics span { display: inline-block; margin-right: 32px; }
+"""
+
+# (result key, section heading) in report order
+REPORT_SECTIONS = (
+    ("rcm", "Recommended RCM"),
+    ("ores", "Related Events (ORES)"),
+    ("audits", "Prior Audits"),
+    ("issues", "Prior Issues"),
+)
+
+
+class ReportJob:
+    """A report being generated for one selection; progress runs from 0 to 1"""
+
+    def __init__(self, selection, version):
+        self.selection = selection
+        self.version = version
+        self.progress = 0.0
+        self.status = "Queued"
+        self.artifact = None
+        self.error = None
+        self.finished_at = None
+
+    @property
+    def done(self):
+        return self.artifact is not None or self.error is not None
+
+    @property
+    def file_name(self):
+        return f"ae_report_{datetime.now():%Y%m%d}.html"
+
+    def _advance(self, progress, status):
+        self.progress = progress
+        self.status = status
+
+
+def _table_html(frame):
+    if frame.empty:
+        return "<p><em>No records found.</em></p>"
+    return frame.to_html(index=False, border=0, na_rep="")
+
+
+def render_report(job, results):
+    """Return the HTML report for a job's selection, updating its progress"""
+    selection = job.selection
+    summary = results["ores_summary"]
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>AE Report - {html.escape(', '.join(selection[:5]))}</title>",
+        f"<style>{REPORT_STYLE}</style></head><body>",
+        "<h1>AE Report</h1>",
+        f"<p class='meta'>Generated {datetime.now():%Y-%m-%d %H:%M} &middot; dataset {html.escape(str(job.version))}</p>",
+        "<h2>Summary</h2>",
+        f"<p><b>{len(selection)}</b> AE(s) selected: {html.escape(', '.join(selection))}</p>",
+        "<div class='metrics'>",
+        f"<span><b>RCM controls:</b> {len(results['rcm'])}</span>",
+        f"<span><b>ORES events:</b> {summary['event_count']}</span>",
+        f"<span><b>Gross impact:</b> {summary['gross_total']:,.0f}</span>",
+        f"<span><b>CAD equivalent:</b> {summary['cad_total']:,.0f}</span>",
+        f"<span><b>Prior audits:</b> {len(results['audits'])}</span>",
+        f"<span><b>Prior issues:</b> {len(results['issues'])}</span>",
+        "</div>",
+    ]
+    for number, (key, heading) in enumerate(REPORT_SECTIONS, 1):
+        job._advance(number / (len(REPORT_SECTIONS) + 1), f"Rendering {heading}")
+        parts.append(f"<h2>{html.escape(heading)}</h2>")
+        parts.append(_table_html(results[key]))
+    if summary["event_count"]:
+        parts.append("<h3>ORES impact by GL account</h3>")
+        parts.append(_table_html(summary["by_gl"]))
+    parts.append("</body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+class ReportManager:
+    """Runs report generation on a background thread pool
+
+    Jobs are deduplicated by selection and dataset version, so asking again
+    for the same QR selection returns the running or finished job at once.
+    """
+
+    def __init__(self, repository, result_cache, workers=REPORT_WORKERS, max_cached=MAX_CACHED_REPORTS):
+        self.repository = repository
+        self.result_cache = result_cache
+        self.max_cached = max_cached
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ae-report")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        repository.add_reload_listener(lambda _repository: self.clear())
+
+    def submit(self, selected_aes):
+        """Return the job for selected_aes, starting it if needed"""
+        selection = canonical_selection(selected_aes)
+        key = (selection, self.repository.version)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.error is None:
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = ReportJob(selection, self.repository.version)
+            self._evict()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, selected_aes):
+        """Return the existing job for selected_aes, or None"""
+        key = (canonical_selection(selected_aes), self.repository.version)
+        with self._lock:
+            return self._jobs.get(key)
+
+    def _run(self, job):
+        try:
+            job._advance(0.05, "Loading AE data")
+            results = self.result_cache.get(job.selection)
+            job.artifact = render_report(job, results)
+            job._advance(1.0, "Ready")
+        except Exception as e:
+            job.error = str(e)
+            job.status = "Failed"
+        job.finished_at = time.time()
+
+    def _evict(self):
+        # Drop the oldest finished reports; running jobs are never evicted
+        finished = [key for key, job in self._jobs.items() if job.done]
+        while len(self._jobs) > self.max_cached and finished:
+            del self._jobs[finished.pop(0)]
+
+    def clear(self):
+        with self._lock:
+            self._jobs.clear()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_report_manager():
+    """Return the process-wide report manager"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = ReportManager(get_repository(), get_result_cache())
+    return _manager
@@ -0,0 +1,350 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Record sources served by the repository, one file or table per source
+SOURCES = ("rcm", "ores", "audits", "issues", "past_issues")
+
+# Identifier-like columns that must stay text even when they look numeric
+STRING_COLUMNS = ("AE ID", "GL Account Code")
+
+# Low-cardinality columns stored as pandas categoricals (small codes, fast filters)
+CATEGORY_COLUMNS = {
+    "rcm": ("Risk", "Business Process"),
+    "ores": ("GL Account Code", "GL Account Description"),
+    "audits": ("Engagement Type", "Audit Status"),
+}
+
+DEFAULT_DATA_PATH = Path(__file__).resolve().parent.parent / "data"
+
+# Page runs check the data files for changes at most this often
+RELOAD_CHECK_SECONDS = float(os.environ.get("AE_RELOAD_CHECK_SECONDS", 10))
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def _readonly(series):
+    """Return the values of series as a read-only array sharing its memory"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy().view()
+        codes.flags.writeable = False
+        return pd.Categorical.from_codes(codes, dtype=series.dtype)
+    if not isinstance(series.dtype, np.dtype):
+        # Extension arrays (Arrow strings, nullable ints...) are passed through as-is
+        return series.array
+    values = series.to_numpy().view()
+    values.flags.writeable = False
+    return values
+
+
+def freeze_frame(frame):
+    """Return frame rebuilt on read-only column arrays, without copying the data
+
+    Frames that are shared between sessions are frozen so an in-place edit
+    (``.loc``/``.iloc`` assignment, ``fillna(inplace=True)`` ...) raises
+    instead of silently changing what every other session sees. Slices of a
+    frozen frame are read-only views as well.
+    """
+    return pd.DataFrame(
+        {column: _readonly(frame[column]) for column in frame.columns},
+        index=frame.index,
+        copy=False,
+    )
+
+
+class AERepository(ABC):
+    """Read-only access to the per-AE records behind the Page_2 tables"""
+
+    version = None
+
+    def __init__(self):
+        self._reload_listeners = []
+
+    def add_reload_listener(self, callback):
+        """Call callback(repository) every time the data is reloaded"""
+        self._reload_listeners.append(callback)
+
+    def _notify_reloaded(self):
+        for callback in list(self._reload_listeners):
+            callback(self)
+
+    @abstractmethod
+    def ae_ids(self):
+        """Return every AE ID known to the repository, sorted"""
+
+    @abstractmethod
+    def columns(self, source):
+        """Return the column names of source, in display order"""
+
+    @abstractmethod
+    def count_for(self, ae_ids, source):
+        """Return how many rows of source belong to ae_ids"""
+
+    @abstractmethod
+    def rows_for(self, ae_ids, source, offset=0, limit=None):
+        """Return the rows of source for ae_ids as a DataFrame, in selection order
+
+        offset and limit select a window of that ordered result without
+        materializing the rows outside it. The returned frame is read-only
+        and may share memory with the repository's own data.
+        """
+
+    @abstractmethod
+    def distinct_values(self, ae_ids, source, column):
+        """Return the sorted distinct non-null values of column among ae_ids' rows"""
+
+    @abstractmethod
+    def query(self, ae_ids, source, filters=None, contains=None, sort_by=None, ascending=True):
+        """Return the rows of source for ae_ids that pass the filters, optionally sorted
+
+        filters maps a column to the values it may take; contains maps a
+        column to a case-insensitive substring it must contain. Predicates
+        and sorting run on the stored columns before any row is copied.
+        """
+
+    @abstractmethod
+    def reload(self):
+        """Re-read the underlying data and rebuild the indexes"""
+
+
+class FileRepository(AERepository):
+    """Repository backed by local CSV/Parquet files or a SQLite database
+
+    path is either a directory holding one ``<source>.parquet`` or
+    ``<source>.csv`` file per source, or a SQLite file with one table per
+    source. Every table carries an "AE ID" column that the per-AE indexes
+    are built on.
+    """
+
+    def __init__(self, path=DEFAULT_DATA_PATH):
+        super().__init__()
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._indexes = {}
+        self._ae_ids = ()
+        self.reload()
+
+    def _source_files(self):
+        if self.path.suffix.lower() in SQLITE_SUFFIXES:
+            return [self.path]
+        files = []
+        for source in SOURCES:
+            for suffix in (".parquet", ".csv"):
+                candidate = self.path / f"{source}{suffix}"
+                if candidate.exists():
+                    files.append(candidate)
+                    break
+        return files
+
+    def _compute_version(self):
+        digest = hashlib.sha1()
+        for file in self._source_files():
+            stat = file.stat()
+            digest.update(f"{file.name}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return digest.hexdigest()[:12]
+
+    def _read_source(self, source):
+        if self.path.suffix.lower() in SQLITE_SUFFIXES:
+            with sqlite3.connect(self.path) as conn:
+                exists = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (source,)
+                ).fetchone()
+                if not exists:
+                    return None
+                frame = pd.read_sql_query(f'SELECT * FROM "{source}"', conn)
+            for column in STRING_COLUMNS:
+                if column in frame.columns:
+                    frame[column] = frame[column].astype(str)
+            return frame
+
+        parquet_file = self.path / f"{source}.parquet"
+        if parquet_file.exists():
+            return pd.read_parquet(parquet_file)
+        csv_file = self.path / f"{source}.csv"
+        if csv_file.exists():
+            return pd.read_csv(csv_file, dtype={column: str for column in STRING_COLUMNS})
+        return None
+
+    def _materialize(self, source, frame):
+        """Group a source frame by AE and index each AE's contiguous row range"""
+        # AE ID goes last so merged tables read "record fields, then owner"
+        columns = [column for column in frame.columns if column != "AE ID"] + ["AE ID"]
+        frame = frame[columns].sort_values("AE ID", kind="stable").reset_index(drop=True)
+        for column in CATEGORY_COLUMNS.get(source, ()):
+            if column in frame.columns:
+                frame[column] = frame[column].astype("category")
+        frame = freeze_frame(frame)
+        ae_values = frame["AE ID"].to_numpy()
+        boundaries = np.flatnonzero(ae_values[1:] != ae_values[:-1]) + 1
+        starts = np.concatenate(([0], boundaries)) if len(frame) else []
+        stops = np.concatenate((boundaries, [len(frame)])) if len(frame) else []
+        index = {ae_values[start]: (start, stop) for start, stop in zip(starts, stops)}
+        return frame, index
+
+    def reload(self):
+        frames = {}
+        indexes = {}
+        for source in SOURCES:
+            frame = self._read_source(source)
+            if frame is None:
+                frame = pd.DataFrame({"AE ID": pd.Series(dtype=str)})
+            frames[source], indexes[source] = self._materialize(source, frame)
+        ae_ids = sorted({ae for index in indexes.values() for ae in index})
+        version = self._compute_version()
+        with self._lock:
+            self._frames = frames
+            self._indexes = indexes
+            self._ae_ids = tuple(ae_ids)
+            self.version = version
+        self._notify_reloaded()
+
+    def reload_if_changed(self):
+        """Reload when the source files changed on disk; return True if reloaded"""
+        if self._compute_version() == self.version:
+            return False
+        self.reload()
+        return True
+
+    def ae_ids(self):
+        return self._ae_ids
+
+    def _ranges(self, ae_ids, source):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source: {source}")
+        index = self._indexes[source]
+        return [index[ae] for ae in ae_ids if ae in index]
+
+    def columns(self, source):
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source: {source}")
+        return list(self._frames[source].columns)
+
+    def count_for(self, ae_ids, source):
+        return sum(stop - start for start, stop in self._ranges(ae_ids, source))
+
+    def _merged_ranges(self, ae_ids, source):
+        """Return the row ranges of ae_ids, with adjacent ranges joined"""
+        merged = []
+        for start, stop in self._ranges(ae_ids, source):
+            if merged and merged[-1][1] == start:
+                merged[-1] = (merged[-1][0], stop)
+            else:
+                merged.append((start, stop))
+        return merged
+
+    def rows_for(self, ae_ids, source, offset=0, limit=None):
+        ranges = self._merged_ranges(ae_ids, source)
+        frame = self._frames[source]
+        remaining = float("inf") if limit is None else limit
+        chunks = []
+        for start, stop in ranges:
+            if remaining <= 0:
+                break
+            size = stop - start
+            if offset >= size:
+                offset -= size
+                continue
+            start += offset
+            offset = 0
+            stop = min(stop, start + remaining)
+            chunks.append((start, stop))
+            remaining -= stop - start
+        if not chunks:
+            return frame.iloc[0:0]
+        if len(chunks) == 1:
+            # One contiguous block (e.g. a run of neighbouring AEs): hand out a
+            # read-only view instead of copying the rows
+            view = frame.iloc[chunks[0][0] : chunks[0][1]]
+            view.index = pd.RangeIndex(len(view))
+            return view
+        positions = np.concatenate([np.arange(start, stop) for start, stop in chunks])
+        return freeze_frame(frame.take(positions).reset_index(drop=True))
+
+    def _positions(self, ae_ids, source):
+        ranges = self._ranges(ae_ids, source)
+        if not ranges:
+            return np.array([], dtype=np.intp)
+        return np.concatenate([np.arange(start, stop) for start, stop in ranges])
+
+    def distinct_values(self, ae_ids, source, column):
+        positions = self._positions(ae_ids, source)
+        series = self._frames[source][column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = np.unique(series.cat.codes.to_numpy()[positions])
+            return [series.cat.categories[code] for code in codes if code >= 0]
+        return sorted(series.take(positions).dropna().unique())
+
+    def query(self, ae_ids, source, filters=None, contains=None, sort_by=None, ascending=True):
+        frame = self._frames[source]
+        positions = self._positions(ae_ids, source)
+        for column, allowed in (filters or {}).items():
+            if not allowed or not len(positions):
+                continue
+            series = frame[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Compare small integer codes instead of strings
+                allowed_codes = series.cat.categories.get_indexer(list(allowed))
+                mask = np.isin(series.cat.codes.to_numpy()[positions], allowed_codes[allowed_codes >= 0])
+            else:
+                mask = series.take(positions).isin(list(allowed)).to_numpy()
+            positions = positions[mask]
+        for column, text in (contains or {}).items():
+            if not text or not len(positions):
+                continue
+            values = frame[column].take(positions).astype(str)
+            positions = positions[values.str.contains(text, case=False, regex=False).to_numpy()]
+        if sort_by and len(positions):
+            series = frame[sort_by]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                keys = series.cat.codes.to_numpy()[positions]
+            else:
+                keys = series.take(positions).to_numpy()
+            order = np.argsort(keys, kind="stable")
+            positions = positions[order if ascending else order[::-1]]
+        return freeze_frame(frame.take(positions).reset_index(drop=True))
+
+
+_repository = None
+_repository_lock = threading.Lock()
+
+
+def get_repository():
+    """Return the process-wide repository, loading it on first use
+
+    The data location can be overridden with the ``AE_DATA_PATH``
+    environment variable.
+    """
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = FileRepository(os.environ.get("AE_DATA_PATH", DEFAULT_DATA_PATH))
+    return _repository
+
+
+_last_check = time.monotonic()
+_check_lock = threading.Lock()
+
+
+def refresh_repository():
+    """Reload the shared repository if its data files changed; return True if reloaded
+
+    Called at the top of every page run. The files are stat'ed at most once
+    per RELOAD_CHECK_SECONDS, and only by one run at a time; the reload
+    listeners then clear the result cache and re-index the changed AEs.
+    """
+    global _last_check
+    if time.monotonic() - _last_check < RELOAD_CHECK_SECONDS or not _check_lock.acquire(blocking=False):
+        return False
+    try:
+        _last_check = time.monotonic()
+        return get_repository().reload_if_changed()
+    finally:
+        _check_lock.release()
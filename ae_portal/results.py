@@ -0,0 +1,486 @@
+import json
+import os
+import struct
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from cachetools import TTLCache
+
+from ae_portal.analytics import ores_rollups
+from ae_portal.cache_backends import get_cache_backend
+from ae_portal.repository import freeze_frame, get_repository
+from ae_portal.selection import canonical_selection
+
+RESULT_CACHE_MAX_ENTRIES = 256
+RESULT_CACHE_TTL_SECONDS = 15 * 60
+
+# Per-AE sources fetched for every Page_2 result set; "ores_summary" is derived from "ores"
+RESULT_SOURCES = ("rcm", "ores", "audits", "issues")
+
+# Every frame in a result set: the sources plus the ORES rollups
+RESULT_NAMES = RESULT_SOURCES + ("ores_summary",)
+
+# Size of the pool shared by every session, i.e. the most source queries run
+# against the data backends at once
+FETCH_WORKERS = int(os.environ.get("AE_FETCH_WORKERS", 8))
+
+# Seconds a Page_2 section waits for its data before rendering without it
+SOURCE_TIMEOUTS = {"rcm": 5.0, "ores": 5.0, "ores_summary": 5.0, "audits": 5.0, "issues": 5.0}
+
+# Sources merged into the consolidated historical view: display tag, and which
+# source column fills each schema column. Unmapped schema columns stay empty;
+# the full source rows remain available as the per-source tables.
+HISTORICAL_SOURCES = (
+    ("rcm", "RCM", {"Title": "Control", "Category": "Risk", "Details": "Test Steps"}),
+    (
+        "ores",
+        "Related Event",
+        {
+            "Record ID": "Event ID",
+            "Title": "Summary",
+            "Category": "GL Account Description",
+            "Date": "Discover Date",
+            "Amount": "Gross Impact on Earnings",
+            "Details": "Description",
+        },
+    ),
+    (
+        "audits",
+        "Prior Audit",
+        {
+            "Record ID": "Audit ID",
+            "Title": "Audit Title",
+            "Category": "Engagement Type",
+            "Reporting Year": "Audit Reporting Year",
+            "Status": "Audit Status",
+        },
+    ),
+)
+
+# One categorical dtype for every tag, so concatenated pages stay categorical
+SOURCE_TYPE_DTYPE = pd.CategoricalDtype([source_type for _, source_type, _ in HISTORICAL_SOURCES])
+
+# Typed columns shared by every record in the consolidated historical view
+HISTORICAL_SCHEMA = {
+    "Source Type": SOURCE_TYPE_DTYPE,
+    "AE ID": "object",
+    "Record ID": "object",
+    "Title": "object",
+    "Category": "object",
+    "Date": "datetime64[ns]",
+    "Reporting Year": "Int64",
+    "Amount": "float64",
+    "Status": "object",
+    "Details": "object",
+}
+
+
+def _typed_column(values, dtype):
+    """Convert one source column to the schema dtype"""
+    if dtype == "datetime64[ns]":
+        return pd.to_datetime(values.astype(str), format="ISO8601", errors="coerce").to_numpy()
+    if dtype == "Int64":
+        return pd.to_numeric(values, errors="coerce").astype("Int64").array
+    if dtype == "float64":
+        return pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64")
+    return np.asarray(values, dtype=object)
+
+
+def _empty_column(dtype, length):
+    if dtype == "datetime64[ns]":
+        return np.full(length, np.datetime64("NaT"), dtype="datetime64[ns]")
+    if dtype == "Int64":
+        return pd.array(np.full(length, None, dtype=object), dtype="Int64")
+    if dtype == "float64":
+        return np.full(length, np.nan)
+    return np.full(length, None, dtype=object)
+
+
+def _historical_arrays(frame, source_type, fields):
+    """Project one source frame onto HISTORICAL_SCHEMA as one array per column
+
+    "Source Type" is returned as its categorical codes, broadcast from the
+    source's single code.
+    """
+    length = len(frame)
+    arrays = {}
+    for column, dtype in HISTORICAL_SCHEMA.items():
+        if column == "Source Type":
+            code = SOURCE_TYPE_DTYPE.categories.get_loc(source_type)
+            arrays[column] = np.broadcast_to(np.int8(code), length)
+        elif column == "AE ID":
+            arrays[column] = _typed_column(frame["AE ID"], dtype)
+        elif column in fields:
+            arrays[column] = _typed_column(frame[fields[column]], dtype)
+        else:
+            arrays[column] = _empty_column(dtype, length)
+    return arrays
+
+
+def _historical_frame(parts):
+    """Concatenate per-source arrays column by column into one typed frame"""
+    columns = {}
+    for column, dtype in HISTORICAL_SCHEMA.items():
+        values = [part[column] for part in parts]
+        if column == "Source Type":
+            codes = np.concatenate(values) if values else np.array([], dtype=np.int8)
+            columns[column] = pd.Categorical.from_codes(codes, dtype=SOURCE_TYPE_DTYPE)
+        elif dtype == "Int64":
+            # Nullable integers: concatenate the values and the missing-value mask separately
+            data = [value.to_numpy(dtype="int64", na_value=0) for value in values]
+            masks = [value.isna() for value in values]
+            columns[column] = pd.arrays.IntegerArray(
+                np.concatenate(data) if data else np.array([], dtype="int64"),
+                np.concatenate(masks) if masks else np.array([], dtype=bool),
+            )
+        else:
+            columns[column] = np.concatenate(values) if values else _empty_column(dtype, 0)
+    return pd.DataFrame(columns, copy=False)
+
+
+def historical_count(repository, selection):
+    """Return the number of rows in the consolidated historical view"""
+    return sum(repository.count_for(selection, source) for source, _, _ in HISTORICAL_SOURCES)
+
+
+def historical_page(repository, selection, offset=0, limit=None):
+    """Return one window of the consolidated historical view
+
+    The offset/limit window is pushed down to each source in turn, so only the
+    rows on the requested page are materialized. Every source is projected
+    onto HISTORICAL_SCHEMA and the typed columns are concatenated directly,
+    so the page has the same compact dtypes whatever sources it spans.
+    """
+    parts = []
+    remaining = limit
+    for source, source_type, fields in HISTORICAL_SOURCES:
+        if remaining is not None and remaining <= 0:
+            break
+        size = repository.count_for(selection, source)
+        if offset >= size:
+            offset -= size
+            continue
+        frame = repository.rows_for(selection, source, offset=offset, limit=remaining)
+        parts.append(_historical_arrays(frame, source_type, fields))
+        offset = 0
+        if remaining is not None:
+            remaining -= len(frame)
+    return _historical_frame(parts)
+
+
+def build_historical(repository, selection):
+    """Build the full consolidated historical view, e.g. for export"""
+    return historical_page(repository, selection)
+
+
+_fetch_pool = None
+_fetch_pool_lock = threading.Lock()
+
+
+def get_fetch_pool():
+    """Return the process-wide, bounded pool that source fetches run on"""
+    global _fetch_pool
+    if _fetch_pool is None:
+        with _fetch_pool_lock:
+            if _fetch_pool is None:
+                _fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="ae-fetch")
+    return _fetch_pool
+
+
+def _ores_summary(ores):
+    return {
+        name: freeze_frame(value) if isinstance(value, pd.DataFrame) else value
+        for name, value in ores_rollups(ores).items()
+    }
+
+
+def start_result_set(repository, selection, executor=None):
+    """Start fetching every Page_2 source for a selection at once; return {name: Future}
+
+    Sources are fetched concurrently on the bounded fetch pool, so a result
+    set takes about as long as its slowest source. The ORES rollups are
+    computed as soon as the ORES rows arrive.
+    """
+    executor = executor or get_fetch_pool()
+    futures = {source: executor.submit(repository.rows_for, selection, source) for source in RESULT_SOURCES}
+    summary = Future()
+
+    def summarize(ores):
+        try:
+            summary.set_result(_ores_summary(ores.result()))
+        except BaseException as error:
+            summary.set_exception(error)
+
+    futures["ores"].add_done_callback(summarize)
+    futures["ores_summary"] = summary
+    return futures
+
+
+def build_result_set(repository, selection, executor=None):
+    """Build every Page_2 table frame for a selection
+
+    Every frame is read-only, since result sets are shared by all sessions.
+    """
+    futures = start_result_set(repository, selection, executor)
+    return {name: future.result() for name, future in futures.items()}
+
+
+def session_view(result):
+    """Return a per-caller view of a shared result set
+
+    Dicts and frames are shallow-copied, so adding or dropping a column only
+    affects the caller's view. The column arrays themselves are shared and
+    read-only.
+    """
+    if isinstance(result, dict):
+        return {name: session_view(value) for name, value in result.items()}
+    if isinstance(result, pd.DataFrame):
+        return result.copy(deep=False)
+    return result
+
+
+def _frozen(result):
+    """Return result with every frame frozen, e.g. after decoding it"""
+    if isinstance(result, dict):
+        return {name: _frozen(value) for name, value in result.items()}
+    if isinstance(result, pd.DataFrame):
+        return freeze_frame(result)
+    return result
+
+
+def _flatten(result, path=()):
+    """Yield (path, leaf) for every frame and scalar of a (nested) result dict"""
+    for name, value in result.items():
+        if isinstance(value, dict):
+            yield from _flatten(value, (*path, name))
+        else:
+            yield (*path, name), value
+
+
+def encode_result(result):
+    """Serialize a result set to bytes for the shared backend, without pickle
+
+    Frames are written as Arrow IPC streams, which keep their dtypes and
+    index, and scalars as JSON; a JSON header lists both. Decoding such a
+    payload only ever yields data, so a tampered cache file cannot run code.
+    """
+    import pyarrow as pa
+
+    frames, values, bodies = [], [], []
+    for path, value in _flatten(result):
+        if isinstance(value, pd.DataFrame):
+            sink = pa.BufferOutputStream()
+            table = pa.Table.from_pandas(value)
+            with pa.ipc.new_stream(sink, table.schema) as writer:
+                writer.write_table(table)
+            body = sink.getvalue().to_pybytes()
+            frames.append([list(path), len(body)])
+            bodies.append(body)
+        else:
+            values.append([list(path), value])
+    header = json.dumps({"frames": frames, "values": values}).encode("utf-8")
+    return b"".join([struct.pack(">I", len(header)), header, *bodies])
+
+
+def decode_result(payload):
+    """Return the result set serialized by encode_result; raises ValueError if the payload is malformed"""
+    import pyarrow as pa
+
+    try:
+        (header_length,) = struct.unpack_from(">I", payload)
+        header = json.loads(payload[4:4 + header_length])
+        result = {}
+
+        def place(path, value):
+            target = result
+            for name in path[:-1]:
+                target = target.setdefault(name, {})
+            target[path[-1]] = value
+
+        position = 4 + header_length
+        for path, length in header["frames"]:
+            if position + length > len(payload):
+                raise ValueError("truncated result payload")
+            place(path, pa.ipc.open_stream(payload[position:position + length]).read_all().to_pandas())
+            position += length
+        for path, value in header["values"]:
+            place(path, value)
+    except (struct.error, KeyError, TypeError, pa.ArrowException) as error:
+        raise ValueError(f"malformed result payload: {error}") from error
+    return result
+
+
+def _chain(source, target):
+    """Copy the outcome of future source into future target once source finishes"""
+
+    def copy(_future):
+        if source.cancelled():
+            target.set_exception(CancelledError())
+        elif source.exception() is not None:
+            target.set_exception(source.exception())
+        else:
+            target.set_result(source.result())
+
+    source.add_done_callback(copy)
+
+
+class ResultCache:
+    """Session-independent TTL cache of Page_2 result sets
+
+    Entries are keyed on the canonical AE tuple and the repository's dataset
+    version, and the whole cache is dropped when the repository reloads.
+    Each entry holds one future per source, reserved under the lock before
+    the fetch starts, so concurrent sessions asking for the same selection share one
+    fetch and each section can wait for just its own source. A fetch that
+    fails is dropped from the cache so the next request retries it.
+
+    backend is an optional CacheBackend shared with other worker processes:
+    result sets built here are written to it with encode_result(), and local
+    misses are served from it before building. Its entries are keyed on the dataset version
+    too, so stale ones are never read and simply age out.
+    """
+
+    def __init__(
+        self,
+        repository,
+        maxsize=RESULT_CACHE_MAX_ENTRIES,
+        ttl=RESULT_CACHE_TTL_SECONDS,
+        backend=None,
+        executor=None,
+    ):
+        self.repository = repository
+        self.backend = backend
+        self.executor = executor
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        repository.add_reload_listener(lambda _repository: self.clear())
+
+    def _futures(self, selected_aes, count_hit=True):
+        selection = canonical_selection(selected_aes)
+        key = (selection, self.repository.version)
+        with self._lock:
+            futures = self._entries.get(key)
+            if futures is not None:
+                if count_hit:
+                    self.hits += 1
+                return futures
+            # Reserve the entry before fetching, so concurrent misses wait on this fetch
+            futures = {name: Future() for name in RESULT_NAMES}
+            self._entries[key] = futures
+        self._on_complete(key, futures)
+
+        shared = self._shared(key)
+        if shared is not None:
+            with self._lock:
+                self.shared_hits += 1
+            for name, future in futures.items():
+                future.set_result(shared[name])
+            return futures
+        with self._lock:
+            self.misses += 1
+        try:
+            started = start_result_set(self.repository, selection, self.executor)
+        except BaseException as error:
+            for future in futures.values():
+                future.set_exception(error)
+            raise
+        for name, future in started.items():
+            _chain(future, futures[name])
+        return futures
+
+    def _shared(self, key):
+        """Return the result set for key from the backend, or None if absent or unreadable"""
+        payload = self.backend.get(key) if self.backend is not None else None
+        if payload is None:
+            return None
+        try:
+            result = _frozen(decode_result(payload))
+        except ValueError:
+            return None
+        return result if set(result) == set(RESULT_NAMES) else None
+
+    def _on_complete(self, key, futures):
+        """Write a finished result set to the backend, or drop it if a fetch failed"""
+        remaining = [len(futures)]
+        counter_lock = threading.Lock()
+
+        def done(_future):
+            with counter_lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            if any(future.exception() is not None for future in futures.values()):
+                with self._lock:
+                    if self._entries.get(key) is futures:
+                        del self._entries[key]
+            elif self.backend is not None:
+                result = {name: future.result() for name, future in futures.items()}
+                self.backend.put(key, encode_result(result))
+
+        for future in futures.values():
+            future.add_done_callback(done)
+
+    def get(self, selected_aes):
+        """Return the full result set for selected_aes, waiting for every source
+
+        Callers get a session_view() of the cached entry, never the entry itself.
+        get() and prefetch() are the lookups counted in stats(), once per page
+        run; source() and ready() only read the entry a prefetch made (a
+        missing entry is still fetched, and counted as a miss).
+        """
+        futures = self._futures(selected_aes)
+        return session_view({name: future.result() for name, future in futures.items()})
+
+    def source(self, selected_aes, name, timeout=None):
+        """Return one frame of the result set, waiting at most timeout seconds
+
+        Raises TimeoutError if the source is still being fetched, and
+        re-raises the fetch error if it failed.
+        """
+        return session_view(self._futures(selected_aes, count_hit=False)[name].result(timeout))
+
+    def prefetch(self, selected_aes):
+        """Start fetching the result set for selected_aes without waiting for it"""
+        self._futures(selected_aes)
+
+    def ready(self, selected_aes, name):
+        """Return True once source name of the result set has been fetched (or failed)"""
+        return self._futures(selected_aes, count_hit=False)[name].done()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        with self._lock:
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self._entries.maxsize,
+                "ttl_seconds": self._entries.ttl,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+            }
+        if self.backend is not None:
+            stats["shared"] = self.backend.stats()
+        return stats
+
+
+_result_cache = None
+_result_cache_lock = threading.Lock()
+
+
+def get_result_cache():
+    """Return the process-wide result cache bound to the shared repository"""
+    global _result_cache
+    if _result_cache is None:
+        with _result_cache_lock:
+            if _result_cache is None:
+                _result_cache = ResultCache(get_repository(), backend=get_cache_backend("results"))
+    return _result_cache
@@ -0,0 +1,121 @@
+import bisect
+import re
+import threading
+
+from ae_portal.repository import get_repository
+
+# (source, columns) whose text makes an AE findable from the Home picker
+SEARCH_FIELDS = (
+    ("rcm", ("Risk", "Control", "Test Steps")),
+    ("ores", ("Description",)),
+    ("past_issues", ("Keyword",)),
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Return the lowercase search tokens in text, ignoring single characters"""
+    return {token for token in _TOKEN_PATTERN.findall(str(text).lower()) if len(token) > 1}
+
+
+class SearchIndex:
+    """Inverted index from text tokens to AE IDs with prefix lookups
+
+    Every query term must match (AND). A term matches any indexed token it
+    is a prefix of, so partially typed words already narrow the results.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._ae_tokens = {}
+        self._vocabulary = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._ae_tokens)
+
+    def update_ae(self, ae, tokens):
+        """Replace the tokens indexed for ae, touching only postings that change"""
+        tokens = set(tokens)
+        with self._lock:
+            previous = self._ae_tokens.get(ae, set())
+            for token in previous - tokens:
+                self._remove_posting(token, ae)
+            for token in tokens - previous:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    bisect.insort(self._vocabulary, token)
+                postings.add(ae)
+            self._ae_tokens[ae] = tokens
+
+    def remove_ae(self, ae):
+        with self._lock:
+            for token in self._ae_tokens.pop(ae, set()):
+                self._remove_posting(token, ae)
+
+    def _remove_posting(self, token, ae):
+        postings = self._postings[token]
+        postings.discard(ae)
+        if not postings:
+            del self._postings[token]
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _prefix_matches(self, term):
+        matches = set()
+        start = bisect.bisect_left(self._vocabulary, term)
+        for token in self._vocabulary[start:]:
+            if not token.startswith(term):
+                break
+            matches |= self._postings[token]
+        return matches
+
+    def search(self, query):
+        """Return the sorted AE IDs matching every term of query"""
+        terms = _TOKEN_PATTERN.findall(query.lower())
+        with self._lock:
+            if not terms:
+                return sorted(self._ae_tokens)
+            result = None
+            for term in sorted(terms, key=len, reverse=True):
+                matches = self._prefix_matches(term)
+                result = matches if result is None else result & matches
+                if not result:
+                    return []
+            return sorted(result)
+
+    def sync(self, repository):
+        """Bring the index in line with repository, re-indexing only AEs whose text changed"""
+        documents = {ae: tokenize(ae) for ae in repository.ae_ids()}
+        for source, columns in SEARCH_FIELDS:
+            frame = repository.rows_for(repository.ae_ids(), source)
+            for column in columns:
+                if column not in frame.columns:
+                    continue
+                for ae, text in zip(frame["AE ID"], frame[column]):
+                    documents[ae] |= tokenize(text)
+        with self._lock:
+            for ae in set(self._ae_tokens) - set(documents):
+                self.remove_ae(ae)
+            for ae, tokens in documents.items():
+                if self._ae_tokens.get(ae) != tokens:
+                    self.update_ae(ae, tokens)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """Return the process-wide search index, kept in sync with the shared repository"""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                repository = get_repository()
+                index = SearchIndex()
+                index.sync(repository)
+                repository.add_reload_listener(index.sync)
+                _index = index
+    return _index
@@ -0,0 +1,271 @@
+import base64
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from ae_portal.paths import app_dir
+
+# Inline tokens longer than this are swapped for a short server-side key, so
+# the QR code version stays bounded however many AEs are selected. 128 chars
+# keeps the Page 2 URL within a version 9 code at level M and fits about 50
+# random AEs of a 10k catalogue inline.
+MAX_INLINE_TOKEN_LENGTH = 128
+
+# Inline tokens decoding to more AEs than this, or to a bitset spanning more
+# IDs, are rejected, so a crafted URL cannot make Page 2 build a huge selection
+MAX_SELECTION_SIZE = 100_000
+
+# zlib expands a body at most about 1000-fold, so no token within
+# MAX_INLINE_TOKEN_LENGTH decompresses to more than this many bytes
+MAX_INLINE_BODY_BYTES = 128 * 1024
+
+SELECTION_STORE_FILENAME = "selections.sqlite"
+
+INLINE_MARKER = "1"
+STORED_MARKER = "~"
+
+_DELTA = 0
+_BITSET = 1
+_COMPRESSED = 0x80
+
+_ID_PATTERN = re.compile(r"^(.*?)(\d+)$")
+
+
+def canonical_selection(selected_aes):
+    """Return the sorted, deduplicated tuple form of an AE selection"""
+    return tuple(sorted(set(selected_aes)))
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(data, position):
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _split_ids(selection):
+    """Return (prefix, width, sorted numbers) when every ID is prefix + fixed-width number"""
+    prefix = width = None
+    numbers = []
+    for ae in selection:
+        match = _ID_PATTERN.match(ae)
+        if not match:
+            return None
+        ae_prefix, digits = match.groups()
+        if prefix is None:
+            prefix, width = ae_prefix, len(digits)
+        if ae_prefix != prefix or str(int(digits)).zfill(width) != digits:
+            return None
+        numbers.append(int(digits))
+    return prefix, width, sorted(numbers)
+
+
+def _encode_numbers(numbers):
+    """Return (mode, body) for the smaller of delta-varint and bitset encodings"""
+    delta = bytearray(_varint(len(numbers)))
+    previous = -1
+    for number in numbers:
+        delta += _varint(number - previous - 1)
+        previous = number
+
+    low = numbers[0]
+    span = numbers[-1] - low + 1
+    bits = bytearray((span + 7) // 8)
+    for number in numbers:
+        offset = number - low
+        bits[offset // 8] |= 1 << (offset % 8)
+    bitset = _varint(low) + _varint(span) + bytes(bits)
+
+    if span <= MAX_SELECTION_SIZE and len(bitset) < len(delta):
+        return _BITSET, bitset
+    return _DELTA, bytes(delta)
+
+
+def _decode_numbers(mode, data, position):
+    numbers = []
+    if mode == _DELTA:
+        count, position = _read_varint(data, position)
+        if count > MAX_SELECTION_SIZE:
+            raise ValueError(f"selection of {count} AEs exceeds MAX_SELECTION_SIZE")
+        previous = -1
+        for _ in range(count):
+            gap, position = _read_varint(data, position)
+            previous += gap + 1
+            numbers.append(previous)
+    else:
+        low, position = _read_varint(data, position)
+        span, position = _read_varint(data, position)
+        if span > MAX_SELECTION_SIZE:
+            raise ValueError(f"bitset spanning {span} IDs exceeds MAX_SELECTION_SIZE")
+        for offset in range(span):
+            if data[position + offset // 8] >> (offset % 8) & 1:
+                numbers.append(low + offset)
+    return numbers
+
+
+def _inline_token(selection):
+    parts = _split_ids(selection)
+    if parts is None or not selection or len(selection) > MAX_SELECTION_SIZE:
+        return None
+    prefix, width, numbers = parts
+    mode, encoded = _encode_numbers(numbers)
+    prefix_bytes = prefix.encode("utf-8")
+    body = _varint(len(prefix_bytes)) + prefix_bytes + _varint(width) + encoded
+    compressed = zlib.compress(body, 9)
+    if len(compressed) < len(body):
+        return INLINE_MARKER + _b64encode(bytes([mode | _COMPRESSED]) + compressed)
+    return INLINE_MARKER + _b64encode(bytes([mode]) + body)
+
+
+def _decode_inline(payload):
+    data = _b64decode(payload)
+    if len(data) > MAX_INLINE_BODY_BYTES:
+        raise ValueError("inline token exceeds MAX_INLINE_BODY_BYTES")
+    flags, body = data[0], data[1:]
+    if flags & _COMPRESSED:
+        decompressor = zlib.decompressobj()
+        body = decompressor.decompress(body, MAX_INLINE_BODY_BYTES)
+        if decompressor.unconsumed_tail:
+            raise ValueError("inline token decompresses past MAX_INLINE_BODY_BYTES")
+    prefix_length, position = _read_varint(body, 0)
+    prefix = body[position:position + prefix_length].decode("utf-8")
+    position += prefix_length
+    width, position = _read_varint(body, position)
+    numbers = _decode_numbers(flags & ~_COMPRESSED, body, position)
+    return tuple(f"{prefix}{str(number).zfill(width)}" for number in numbers)
+
+
+class SelectionStore:
+    """Local SQLite store of selections too large to encode inline
+
+    Keys are content hashes, so storing the same selection twice reuses the
+    same key. Entries never expire: printed QR codes refer to them for as
+    long as the codes are in use.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._known = set()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS selections (key TEXT PRIMARY KEY, ids TEXT NOT NULL, stored_at REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def put(self, selection):
+        """Store selection and return its key; a selection already stored is not written again"""
+        joined = "\n".join(selection)
+        key = _b64encode(hashlib.sha256(joined.encode("utf-8")).digest()[:9])
+        if key in self._known:
+            return key
+        with self._lock, self._connect() as conn:
+            if conn.execute("SELECT 1 FROM selections WHERE key = ?", (key,)).fetchone() is None:
+                conn.execute("INSERT OR IGNORE INTO selections VALUES (?, ?, ?)", (key, joined, time.time()))
+        self._known.add(key)
+        return key
+
+    def get(self, key):
+        """Return the stored selection for key, or None if unknown"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT ids FROM selections WHERE key = ?", (key,)).fetchone()
+        return tuple(row[0].split("\n")) if row else None
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_selection_store():
+    """Return the process-wide selection store
+
+    The database lives in the per-user app data directory, which survives
+    temp-dir cleanups; set ``AE_SELECTION_STORE`` to move it, e.g. to a path
+    every server host shares.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SelectionStore(
+                    os.environ.get("AE_SELECTION_STORE") or app_dir("data") / SELECTION_STORE_FILENAME
+                )
+    return _store
+
+
+def inline_obstacle(selected_aes):
+    """Return why selected_aes cannot be encoded inline, or None if its token needs no selection store"""
+    selection = canonical_selection(selected_aes)
+    if not selection:
+        return "it is empty"
+    if _split_ids(selection) is None:
+        return "its IDs are not one prefix + fixed-width number"
+    if len(selection) > MAX_SELECTION_SIZE:
+        return f"it has more than MAX_SELECTION_SIZE ({MAX_SELECTION_SIZE}) AEs"
+    length = len(_inline_token(selection))
+    if length > MAX_INLINE_TOKEN_LENGTH:
+        return f"its inline token would be {length} chars, over MAX_INLINE_TOKEN_LENGTH ({MAX_INLINE_TOKEN_LENGTH})"
+    return None
+
+
+def fits_inline(selected_aes):
+    """Return True if selected_aes encodes inline, i.e. its token needs no selection store"""
+    return inline_obstacle(selected_aes) is None
+
+
+def encode_selection(selected_aes, store=None):
+    """Return a compact URL-safe token for an AE selection
+
+    Selections of prefix + fixed-width numeric IDs are encoded inline as a
+    delta-varint list or a bitset, whichever is smaller, optionally zlib
+    compressed. Anything else, or anything longer than
+    MAX_INLINE_TOKEN_LENGTH, is kept in the selection store under a short key.
+    """
+    selection = canonical_selection(selected_aes)
+    token = _inline_token(selection)
+    if token is not None and len(token) <= MAX_INLINE_TOKEN_LENGTH:
+        return token
+    return STORED_MARKER + (store or get_selection_store()).put(selection)
+
+
+def decode_selection(token, store=None):
+    """Return the AE selection for a token, or () if it is invalid or unknown"""
+    try:
+        if token.startswith(INLINE_MARKER):
+            return _decode_inline(token[len(INLINE_MARKER):])
+        if token.startswith(STORED_MARKER):
+            return (store or get_selection_store()).get(token[len(STORED_MARKER):]) or ()
+    except (ValueError, IndexError, zlib.error, UnicodeDecodeError):
+        pass
+    return ()
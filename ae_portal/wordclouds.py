@@ -0,0 +1,83 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from collections import Counter
+from io import BytesIO
+from pathlib import Path
+
+from ae_portal.paths import app_dir
+
+WORDCLOUD_CACHE_DIRNAME = "wordclouds"
+
+_VERSION_DIR = re.compile(r"^v[0-9a-f]{16}$")
+
+WORDCLOUD_SETTINGS = (("width", 600), ("height", 300), ("background_color", "white"))
+
+
+def issue_frequencies(repository, ae_id):
+    """Return keyword -> count for an AE's past issues"""
+    return Counter(repository.rows_for([ae_id], "past_issues")["Keyword"].dropna())
+
+
+def render_wordcloud(frequencies, settings=WORDCLOUD_SETTINGS):
+    """Render a word cloud straight to PNG bytes, without matplotlib"""
+    from wordcloud import WordCloud
+
+    image = WordCloud(**dict(settings)).generate_from_frequencies(frequencies).to_image()
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def cache_dir():
+    """Return the word-cloud cache directory (``AE_WORDCLOUD_CACHE`` overrides the default)"""
+    override = os.environ.get("AE_WORDCLOUD_CACHE")
+    return Path(override) if override else app_dir("cache") / WORDCLOUD_CACHE_DIRNAME
+
+
+def _version_dir(version):
+    """Return the cache subdirectory for a dataset version, removing those of other versions on creation"""
+    root = cache_dir()
+    path = root / f"v{hashlib.sha1(repr(version).encode()).hexdigest()[:16]}"
+    if not path.is_dir():
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        for entry in root.iterdir():
+            if entry != path and entry.is_dir() and _VERSION_DIR.match(entry.name):
+                shutil.rmtree(entry, ignore_errors=True)
+    return path
+
+
+def wordcloud_png(repository, ae_id, settings=WORDCLOUD_SETTINGS):
+    """Return the past-issue word cloud PNG for an AE, or None if it has no past issues
+
+    Images are rendered once per AE, dataset version and settings, and kept on
+    disk so every session and worker on the host reuses them. A cache that
+    cannot be written only costs a re-render.
+    """
+    key = hashlib.sha1(repr((ae_id, settings)).encode()).hexdigest()
+    try:
+        path = _version_dir(repository.version) / f"{key}.png"
+    except OSError:
+        path = None
+    if path is not None and path.exists():
+        return path.read_bytes()
+
+    frequencies = issue_frequencies(repository, ae_id)
+    if not frequencies:
+        return None
+    png = render_wordcloud(frequencies, settings)
+
+    if path is None:
+        return png
+    # Write to a temporary file first so readers never see a partial image
+    try:
+        handle, temporary = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(handle, "wb") as file:
+            file.write(png)
+        os.replace(temporary, path)
+    except OSError:
+        # e.g. another worker pruned this version's directory meanwhile
+        pass
+    return png
@@ -0,0 +1,137 @@
+"""Burst-scan load test for QR-triggered prefetching
+
+Simulates the traffic a QR code on a projector gets: the code is generated on
+Home, then a room full of phones opens Page 2 for the same selection within a
+second or two. Each burst uses a new selection against a repository that
+sleeps like remote backends (benchmarks.parallel_fetch.SlowRepository), and
+is run twice: with a cold cache, where the first phone starts the fetch and
+the others join it, and with the result set prefetched when the QR code is
+generated, as Home now does. Arrival times are seeded, so runs are
+reproducible.
+
+For each mode it reports the Page 2 result-set latency seen by the phones and
+the share served from a finished entry, i.e. faster than any simulated
+backend round trip, next to the result cache's hits and misses (with
+prefetching, the misses are the prefetches themselves). It also compares
+the cost of counting a view through the in-memory selection tracker with a
+direct popularity log write.
+
+    python -m benchmarks.burst_scan
+    python -m benchmarks.burst_scan --bursts 10 --phones 40 --scan-delay 2
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# AEs in each burst's selection
+SELECTION_SIZE = 50
+
+# Phones arrive over this many seconds after the first one
+ARRIVAL_SPREAD_SECONDS = 1.0
+
+# Views counted when timing the tracker against direct log writes
+RECORD_SAMPLES = 2000
+
+
+def run_burst(cache, tracker, selection, phones, scan_delay, rng, prefetch):
+    """Generate a QR code for selection, then let phones open Page 2; return their latencies in ms"""
+    arrivals = scan_delay + np.sort(rng.uniform(0, ARRIVAL_SPREAD_SECONDS, size=phones))
+    latencies = [None] * phones
+    started = time.perf_counter()
+    if prefetch:
+        cache.prefetch(selection)
+
+    def phone(index):
+        time.sleep(max(0.0, started + arrivals[index] - time.perf_counter()))
+        began = time.perf_counter()
+        tracker.record(selection)
+        cache.get(selection)
+        latencies[index] = (time.perf_counter() - began) * 1000
+
+    threads = [threading.Thread(target=phone, args=(index,)) for index in range(phones)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q))
+
+
+def time_record(record, selections):
+    started = time.perf_counter()
+    for index in range(RECORD_SAMPLES):
+        record(selections[index % len(selections)])
+    return (time.perf_counter() - started) / RECORD_SAMPLES * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure Page 2 latency under QR scan bursts, with and without prefetch.")
+    parser.add_argument("--bursts", type=int, default=5, help="QR codes generated, one selection each")
+    parser.add_argument("--phones", type=int, default=25, help="scans per QR code")
+    parser.add_argument("--scan-delay", type=float, default=0.5, help="seconds from QR generation to the first scan")
+    parser.add_argument("--per-ae-ms", type=float, default=1.0, help="scale of the simulated per-AE cost")
+    parser.add_argument("--scale", type=int, default=2000, help="AEs in the synthetic catalogue")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    from ae_portal.popularity import PopularityLog, SelectionTracker
+    from ae_portal.repository import FileRepository
+    from ae_portal.results import ResultCache
+    from benchmarks.parallel_fetch import SOURCE_LATENCY_MS, SlowRepository
+    from benchmarks.synthetic import generate_dataset
+
+    work_dir = Path(tempfile.mkdtemp(prefix="ae_bench_burst_"))
+    ae_ids = generate_dataset(str(work_dir / "data"), args.scale)
+    repository = SlowRepository(FileRepository(str(work_dir / "data")), per_ae_scale=args.per_ae_ms)
+    fastest_round_trip = min(round_trip for round_trip, _ in SOURCE_LATENCY_MS.values())
+
+    selection_rng = np.random.default_rng(args.seed)
+    selections = [
+        tuple(sorted(str(ae) for ae in selection_rng.choice(ae_ids, size=min(SELECTION_SIZE, len(ae_ids)), replace=False)))
+        for _ in range(args.bursts)
+    ]
+
+    print(f"{args.bursts} bursts x {args.phones} phones, first scan {args.scan_delay:.1f}s after generation")
+    print(f"  {'mode':<9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'warm':>6} {'hits':>5} {'misses':>6}")
+    for mode in ("cold", "prefetch"):
+        cache = ResultCache(repository)
+        tracker = SelectionTracker(PopularityLog(work_dir / f"{mode}.sqlite"))
+        rng = np.random.default_rng(args.seed)
+        latencies = []
+        for selection in selections:
+            latencies.extend(
+                run_burst(cache, tracker, selection, args.phones, args.scan_delay, rng, prefetch=mode == "prefetch")
+            )
+        stats = cache.stats()
+        warm = sum(latency < fastest_round_trip for latency in latencies) / len(latencies)
+        print(
+            f"  {mode:<9} {statistics.median(latencies):>8.2f} {percentile(latencies, 95):>8.2f} "
+            f"{max(latencies):>8.2f} {warm:>6.0%} {stats['hits']:>5} {stats['misses']:>6}"
+        )
+        hottest = tracker.hot(1)[0][1]
+        tracker.flush()
+
+    print(f"  tracker: the hottest selection had {hottest} views within the burst window")
+
+    log = PopularityLog(work_dir / "record.sqlite")
+    tracker = SelectionTracker(log)
+    direct = time_record(log.record, selections)
+    tracked = time_record(tracker.record, selections)
+    print(f"  counting a view: {tracked:.1f} us in-memory tracker vs {direct:.1f} us direct log write")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
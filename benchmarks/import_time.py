@@ -0,0 +1,107 @@
+"""Import-time benchmark for the Streamlit pages
+
+Runs each page's module-level code in a fresh interpreter under
+``python -X importtime`` and fails when the cumulative import time exceeds
+its budget, or when a heavy visualization library is imported eagerly.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget-ms 1200 --repeat 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+PAGES = ("Home.py", "pages/Page_2.py")
+
+# Libraries that must only be imported by the sections that render with them.
+# Anything streamlit itself imports (it pulls in plotly.graph_objects) is not
+# charged to the page.
+LAZY_MODULES = ("plotly.express", "wordcloud", "matplotlib")
+
+# Cumulative import budget per page, in milliseconds
+DEFAULT_BUDGET_MS = 1500
+
+PROBE = """
+import json, runpy, sys
+{body}
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+def parse_importtime(stderr):
+    """Return {top-level module: cumulative microseconds} from -X importtime output"""
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, rest = line.partition("import time:")
+        _self_us, cumulative_us, name = (part for part in rest.split("|"))
+        # Nested imports are indented under the module that triggered them
+        if name.startswith(" ") and not name.startswith("  "):
+            cumulative[name.strip()] = int(cumulative_us)
+    return cumulative
+
+
+def measure(body):
+    """Run body in a fresh interpreter; return (per-module us, loaded module names)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE.format(body=body)],
+        cwd=ROOT,
+        env={**_clean_env(), "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    loaded = set(json.loads(result.stdout.strip().splitlines()[-1]))
+    return parse_importtime(result.stderr), loaded
+
+
+def is_lazy(name):
+    return any(name == lazy or name.startswith(lazy + ".") for lazy in LAZY_MODULES)
+
+
+def _clean_env():
+    import os
+
+    env = dict(os.environ)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    return env
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="slowest imports to list per page")
+    args = parser.parse_args(argv)
+
+    _, baseline = measure("import streamlit")
+
+    failed = False
+    for page in PAGES:
+        totals = []
+        for _ in range(args.repeat):
+            per_module, loaded = measure(f"runpy.run_path({page!r}, run_name='import_time_probe')")
+            totals.append(sum(per_module.values()) / 1000)
+        median_ms = statistics.median(totals)
+
+        eager = sorted({name.split(".")[0] for name in loaded - baseline if is_lazy(name)})
+        over_budget = median_ms > args.budget_ms
+        status = "FAIL" if eager or over_budget else "ok"
+        print(f"{page}: {median_ms:.0f} ms median import time (budget {args.budget_ms:.0f} ms) [{status}]")
+        for name, us in sorted(per_module.items(), key=lambda item: -item[1])[: args.top]:
+            print(f"    {us / 1000:8.1f} ms  {name}")
+        if eager:
+            print(f"    eagerly imported: {', '.join(eager)}")
+        failed = failed or bool(eager) or over_budget
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Serial vs concurrent Page 2 source fetch
+
+Wraps the repository in a stand-in for remote backends that adds a fixed
+round-trip plus a per-AE cost to every query, with a different speed per
+source. It then builds the Page 2 result set for selections of increasing
+size twice: one source after another, as the page used to, and concurrently
+on the bounded fetch pool (ae_portal.results.start_result_set). The
+concurrent time should track the slowest single source, not the sum.
+
+    python -m benchmarks.parallel_fetch
+    python -m benchmarks.parallel_fetch --sizes 10 100 --per-ae-ms 0.5
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_SIZES = (1, 10, 50, 200)
+
+# Simulated round-trip per query and cost per AE, in milliseconds, per source
+SOURCE_LATENCY_MS = {
+    "rcm": (20, 0.4),
+    "ores": (35, 0.6),
+    "audits": (15, 0.3),
+    "issues": (25, 0.2),
+}
+
+
+class SlowRepository:
+    """Delegates to a repository, sleeping like a remote backend would on every query"""
+
+    def __init__(self, repository, per_ae_scale=1.0):
+        self.repository = repository
+        self.per_ae_scale = per_ae_scale
+
+    def delay(self, ae_ids, source):
+        round_trip, per_ae = SOURCE_LATENCY_MS.get(source, (0, 0))
+        return (round_trip + per_ae * self.per_ae_scale * len(ae_ids)) / 1000
+
+    def rows_for(self, ae_ids, source, offset=0, limit=None):
+        time.sleep(self.delay(ae_ids, source))
+        return self.repository.rows_for(ae_ids, source, offset=offset, limit=limit)
+
+    def __getattr__(self, name):
+        # version, add_reload_listener, ...: everything a ResultCache needs besides rows_for
+        return getattr(self.repository, name)
+
+
+def serial_result_set(repository, selection):
+    """Fetch the sources one after another, as Page 2 did before the fetch pool"""
+    from ae_portal.results import RESULT_SOURCES, _ores_summary
+
+    result = {source: repository.rows_for(selection, source) for source in RESULT_SOURCES}
+    result["ores_summary"] = _ores_summary(result["ores"])
+    return result
+
+
+def median_ms(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare serial and concurrent Page 2 source fetches.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="AEs per selection")
+    parser.add_argument("--per-ae-ms", type=float, default=1.0, help="scale of the simulated per-AE cost")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    from ae_portal.repository import FileRepository
+    from ae_portal.results import RESULT_SOURCES, build_result_set
+    from benchmarks.synthetic import generate_dataset
+
+    data_dir = tempfile.mkdtemp(prefix="ae_bench_fetch_")
+    ae_ids = generate_dataset(data_dir, max(args.sizes))
+    repository = SlowRepository(FileRepository(data_dir), per_ae_scale=args.per_ae_ms)
+
+    print(f"{'AEs':>6}   {'serial ms':>10} {'concurrent ms':>14} {'slowest source ms':>18} {'speedup':>8}")
+    for size in args.sizes:
+        selection = tuple(ae_ids[:size])
+        serial = median_ms(lambda: serial_result_set(repository, selection), args.repeat)
+        concurrent = median_ms(lambda: build_result_set(repository, selection), args.repeat)
+        slowest = max(repository.delay(selection, source) for source in RESULT_SOURCES) * 1000
+        print(f"{size:>6}   {serial:>10.1f} {concurrent:>14.1f} {slowest:>18.1f} {serial / concurrent:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""PNG vs SVG QR micro-benchmark
+
+Renders the Page 2 QR code for selections of increasing size in both output
+formats, at every error-correction level, and reports the median render time
+and the payload size. The PNG is already a deflated 1-bit image, so the SVG
+is also reported gzipped, as it travels with HTTP/websocket compression. Selections past MAX_INLINE_TOKEN_LENGTH are stored
+server-side, so their URL, and hence their code, stops growing.
+
+    python -m benchmarks.qr_formats
+    python -m benchmarks.qr_formats --sizes 1 10 100 --levels L H --box-size 4
+"""
+import argparse
+import gzip
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_SIZES = (1, 5, 25, 100, 1000)
+DEFAULT_REPEAT = 25
+
+
+def median_ms(function, repeat):
+    function()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare PNG and SVG QR rendering.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="AEs per selection")
+    parser.add_argument("--levels", nargs="+", default=["L", "M", "Q", "H"], help="error-correction levels")
+    parser.add_argument("--box-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    from ae_portal.qr import DEFAULT_BASE_URL, render_qr, render_settings
+    from ae_portal.selection import SelectionStore, encode_selection
+
+    store = SelectionStore(Path(tempfile.mkdtemp(prefix="ae_qr_bench_")) / "selections.sqlite")
+    print(f"{'AEs':>6} {'level':>5} {'url':>5}   {'png ms':>8} {'png KiB':>8}   {'svg ms':>8} {'svg KiB':>8} {'gz KiB':>7}   {'speedup':>7}")
+    for size in args.sizes:
+        selection = tuple(f"AE-{number:04d}" for number in range(1, size + 1))
+        url = f"{DEFAULT_BASE_URL}?s={encode_selection(selection, store=store)}"
+        for level in args.levels:
+            results = {}
+            for qr_format in ("png", "svg"):
+                settings = render_settings(qr_format, error_correction=level, box_size=args.box_size)
+                results[qr_format] = (
+                    median_ms(lambda: render_qr(url, settings), args.repeat),
+                    len(render_qr(url, settings)),
+                )
+            (png_ms, png_bytes), (svg_ms, svg_bytes) = results["png"], results["svg"]
+            svg_gzip_bytes = len(gzip.compress(render_qr(url, render_settings("svg", error_correction=level, box_size=args.box_size))))
+            print(
+                f"{size:>6} {level:>5} {len(url):>5}   {png_ms:>8.2f} {png_bytes / 1024:>8.1f}   "
+                f"{svg_ms:>8.2f} {svg_bytes / 1024:>8.1f} {svg_gzip_bytes / 1024:>7.1f}   {png_ms / svg_ms:>6.1f}x"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,230 @@
+"""Latency and memory benchmarks for Home and Page_2
+
+Each catalogue scale runs in its own interpreter against a synthetic dataset
+(see benchmarks/synthetic.py). Every scenario is timed over several repeats
+and reported as p50/p95 latency plus peak traced memory, and compared with
+the stored baselines in benchmarks/baselines.json. The "_xN" scenarios run N
+sessions at once on the shared result cache, each on its own selection, and
+time the whole batch: "cold" after clearing the cache, so every session
+fetches, and "warm" with every selection cached. (AppTest sessions cannot
+run in parallel threads, so the page itself is timed one session at a time.)
+
+    python -m benchmarks.run                       # 10 and 1k AEs
+    python -m benchmarks.run --scales 10 1000 100000
+    python -m benchmarks.run --save-baseline       # record new baselines
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINES = Path(__file__).resolve().parent / "baselines.json"
+
+DEFAULT_SCALES = (10, 1000)
+DEFAULT_REPEAT = 7
+
+# AEs in the benchmarked selection, capped by the catalogue size
+SELECTION_SIZE = 100
+
+# Sessions run at once in the concurrency scenarios
+CONCURRENT_SESSIONS = (4, 16)
+
+# A scenario regresses when its p50 grows by more than this fraction over the baseline
+REGRESSION_TOLERANCE = 0.25
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(function, repeat):
+    """Return p50/p95 milliseconds and peak traced KiB for function"""
+    function()  # warm-up, so imports and first-use caches are not counted
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(percentile(timings, 0.95), 3),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def app_run(page, selection=None):
+    """Return a callable that runs page once in a fresh AppTest session
+
+    On Home, selection is picked in the AE multiselect, so the run renders
+    its QR code through generate_qr_code(); on Page 2 it arrives as the
+    scanned ?s= token.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    def run():
+        at = AppTest.from_file(str(ROOT / page), default_timeout=300)
+        if selection is not None and page == "Home.py":
+            at.session_state["selected_aes"] = list(selection)
+        elif selection is not None:
+            from ae_portal.selection import encode_selection
+
+            at.query_params["s"] = encode_selection(selection)
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        if page == "Home.py" and selection is not None and not at.text:
+            raise RuntimeError("Home did not render a QR code for the selection")
+
+    return run
+
+
+def concurrently(function, sessions, setup=None):
+    """Return a callable that runs function(session) for every session at once and waits for all"""
+
+    def run():
+        if setup is not None:
+            setup()
+        with ThreadPoolExecutor(max_workers=sessions) as pool:
+            list(pool.map(function, range(sessions)))
+
+    return run
+
+
+def run_scale(scale, repeat):
+    """Run every scenario against a synthetic catalogue of scale AEs; return results"""
+    from benchmarks.synthetic import generate_dataset
+
+    data_dir = tempfile.mkdtemp(prefix=f"ae_bench_{scale}_")
+    ae_ids = generate_dataset(data_dir, scale)
+    os.environ["AE_DATA_PATH"] = data_dir
+    os.environ["AE_WORDCLOUD_CACHE"] = str(Path(data_dir) / "wordclouds")
+    sys.path.insert(0, str(ROOT))
+
+    from ae_portal.export import export_historical
+    from ae_portal.qr import QRImageCache, build_qr_url, cached_qr_image, render_qr_png
+    from ae_portal.repository import get_repository
+    from ae_portal.results import build_historical, build_result_set, get_result_cache
+
+    started = time.perf_counter()
+    repository = get_repository()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    selection = tuple(ae_ids[:SELECTION_SIZE])
+    results = build_result_set(repository, selection)
+    historical = build_historical(repository, selection)
+    warm_cache = QRImageCache()
+    url = build_qr_url(selection)
+
+    scenarios = {
+        "qr_render": lambda: render_qr_png(build_qr_url(selection)),
+        "qr_cached": lambda: cached_qr_image(selection, url, cache=warm_cache),
+        "page2_tables": lambda: build_result_set(repository, selection),
+        "page2_result_cache": lambda: get_result_cache().get(selection),
+        "historical_merge": lambda: build_historical(repository, selection),
+        "export_csv": lambda: export_historical(results, historical, "CSV"),
+        "export_parquet": lambda: export_historical(results, historical, "Parquet"),
+        "export_excel": lambda: export_historical(results, historical, "Excel"),
+        "home_apptest": app_run("Home.py", selection),
+        "page2_apptest": app_run("pages/Page_2.py", selection),
+    }
+
+    def session_selection(session):
+        # Each session views its own window of the catalogue (they overlap on small ones)
+        start = session * SELECTION_SIZE % len(ae_ids)
+        return tuple((ae_ids * 2)[start:start + min(SELECTION_SIZE, len(ae_ids))])
+
+    for sessions in CONCURRENT_SESSIONS:
+        scenarios[f"result_set_cold_x{sessions}"] = concurrently(
+            lambda session: get_result_cache().get(session_selection(session)),
+            sessions,
+            setup=get_result_cache().clear,
+        )
+        scenarios[f"result_set_warm_x{sessions}"] = concurrently(
+            lambda session: get_result_cache().get(session_selection(session)), sessions
+        )
+
+    measured = {"repository_load": {"p50_ms": round(load_ms, 3), "p95_ms": round(load_ms, 3), "peak_kib": None}}
+    for name, function in scenarios.items():
+        measured[name] = measure(function, repeat)
+    return {
+        "ae_count": scale,
+        "selection_size": len(selection),
+        "historical_rows": len(historical),
+        "scenarios": measured,
+    }
+
+
+def compare(results, baselines):
+    """Print a report of results against baselines; return the regressed scenario names"""
+    regressions = []
+    for scale, result in results.items():
+        print(f"\n{scale} AEs (selection of {result['selection_size']}, {result['historical_rows']} historical rows)")
+        print(f"  {'scenario':<20} {'p50 ms':>10} {'p95 ms':>10} {'peak KiB':>10} {'baseline p50':>13}")
+        for name, stats in result["scenarios"].items():
+            baseline = baselines.get(scale, {}).get("scenarios", {}).get(name)
+            note = ""
+            if baseline:
+                change = stats["p50_ms"] / baseline["p50_ms"] - 1 if baseline["p50_ms"] else 0
+                note = f"{baseline['p50_ms']:>10.2f} ({change:+.0%})"
+                if change > REGRESSION_TOLERANCE:
+                    note += "  REGRESSION"
+                    regressions.append(f"{scale}/{name}")
+            peak = "-" if stats["peak_kib"] is None else f"{stats['peak_kib']:.0f}"
+            print(f"  {name:<20} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} {peak:>10} {note}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Home and Page_2.")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child is not None:
+        print(json.dumps(run_scale(args.child, args.repeat)))
+        return 0
+
+    results = {}
+    for scale in args.scales:
+        # A fresh interpreter per scale keeps the process-wide caches independent
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--child", str(scale), "--repeat", str(args.repeat)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        results[str(scale)] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    regressions = compare(results, baselines)
+    if args.save_baseline:
+        baselines.update(results)
+        BASELINES.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"\nSaved baselines to {BASELINES.relative_to(ROOT)}")
+        return 0
+    if regressions:
+        print(f"\nRegressed: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
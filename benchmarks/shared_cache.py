@@ -0,0 +1,107 @@
+"""Cross-worker cache benchmark for the shared cache backend
+
+Starts several worker processes against one synthetic catalogue, the way a
+multi-worker deployment runs behind a load balancer. Every worker serves its
+own stream of QR and Page 2 requests, drawn from the same skewed popularity
+distribution. The run is repeated with process-local caches only
+(AE_CACHE_BACKEND=memory) and with the SQLite store shared between the
+workers (AE_CACHE_BACKEND=sqlite). For each mode it reports how requests were
+served: local hit, shared hit or rebuilt.
+
+    python -m benchmarks.shared_cache
+    python -m benchmarks.shared_cache --workers 8 --requests 400 --scale 5000
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Distinct selections requested, and the AEs in each
+SELECTION_POOL = 200
+SELECTION_SIZE = 20
+
+# Zipf exponent of selection popularity; a few selections get most requests
+POPULARITY_SKEW = 1.2
+
+
+def worker(data_dir, backend, cache_path, selections, seed, requests, results):
+    os.environ["AE_DATA_PATH"] = data_dir
+    os.environ["AE_CACHE_BACKEND"] = backend
+    os.environ["AE_SHARED_CACHE_PATH"] = cache_path
+    sys.path.insert(0, str(ROOT))
+    from ae_portal.qr import build_qr_url, cached_qr_image, qr_cache
+    from ae_portal.results import get_result_cache
+
+    rng = np.random.default_rng(seed)
+    ranks = np.arange(1, len(selections) + 1)
+    weights = ranks ** -POPULARITY_SKEW
+    picks = rng.choice(len(selections), size=requests, p=weights / weights.sum())
+    result_cache = get_result_cache()
+    timings = []
+    for pick in picks:
+        selection = selections[pick]
+        started = time.perf_counter()
+        cached_qr_image(("bench", selection), build_qr_url(selection))
+        result_cache.get(selection)
+        timings.append((time.perf_counter() - started) * 1000)
+    results.put({"qr": qr_cache.stats(), "results": result_cache.stats(), "timings": timings})
+
+
+def run_mode(backend, data_dir, selections, workers, requests):
+    cache_path = str(Path(tempfile.mkdtemp(prefix="ae_shared_cache_")) / "cache.sqlite")
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    processes = [
+        context.Process(target=worker, args=(data_dir, backend, cache_path, selections, seed, requests, queue))
+        for seed in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    reports = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    print(f"\n{backend} backend, {workers} workers x {requests} requests")
+    print(f"  {'cache':<8} {'local hits':>10} {'shared hits':>11} {'rebuilt':>8} {'hit rate':>8}")
+    for name in ("qr", "results"):
+        local = sum(report[name]["hits"] for report in reports)
+        shared = sum(report[name]["shared_hits"] for report in reports)
+        rebuilt = sum(report[name]["misses"] for report in reports)
+        total = local + shared + rebuilt
+        print(f"  {name:<8} {local:>10} {shared:>11} {rebuilt:>8} {(local + shared) / total:>8.1%}")
+    timings = [timing for report in reports for timing in report["timings"]]
+    print(f"  request latency: mean {statistics.mean(timings):.2f} ms, p50 {statistics.median(timings):.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the cross-worker hit rate of the shared cache.")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=200, help="requests per worker")
+    parser.add_argument("--scale", type=int, default=1000, help="AEs in the synthetic catalogue")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, str(ROOT))
+    from benchmarks.synthetic import generate_dataset
+
+    data_dir = tempfile.mkdtemp(prefix=f"ae_bench_{args.scale}_")
+    ae_ids = generate_dataset(data_dir, args.scale)
+    rng = np.random.default_rng(0)
+    selections = [
+        tuple(sorted(str(ae) for ae in rng.choice(ae_ids, size=min(SELECTION_SIZE, len(ae_ids)), replace=False)))
+        for _ in range(SELECTION_POOL)
+    ]
+    for backend in ("memory", "sqlite"):
+        run_mode(backend, data_dir, selections, args.workers, args.requests)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
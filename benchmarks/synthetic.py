@@ -0,0 +1,69 @@
+"""Synthetic AE catalogues scaled up from the sample data in data/
+
+Every synthetic AE is a copy of one of the sample AEs (round robin) with
+fresh AE, event, audit and issue IDs, so row shapes and text lengths match
+the real fixtures.
+
+    python -m benchmarks.synthetic 1000 /tmp/ae_1k
+"""
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ae_portal.repository import DEFAULT_DATA_PATH, SOURCES, FileRepository
+
+# Per-source ID columns that must stay unique across synthetic copies
+ID_COLUMNS = {"ores": "Event ID", "audits": "Audit ID", "issues": "Issue ID"}
+
+
+def synthetic_ae_ids(ae_count):
+    width = max(4, len(str(ae_count)))
+    return [f"AE-{number:0{width}d}" for number in range(1, ae_count + 1)]
+
+
+def generate_dataset(path, ae_count, file_format="parquet", template_path=DEFAULT_DATA_PATH):
+    """Write a catalogue of ae_count AEs to path, one file per source; return its AE IDs"""
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    template = FileRepository(template_path)
+    template_ids = list(template.ae_ids())
+    ae_ids = synthetic_ae_ids(ae_count)
+    # Synthetic AE i copies template AE i % len(template_ids)
+    owners = np.arange(ae_count) % len(template_ids)
+
+    for source in SOURCES:
+        blocks = [template.rows_for([ae], source) for ae in template_ids]
+        sizes = np.array([len(block) for block in blocks])
+        stacked = pd.concat(blocks, ignore_index=True)
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        positions = np.concatenate(
+            [np.arange(starts[owner], starts[owner] + sizes[owner]) for owner in owners]
+        ) if ae_count else np.array([], dtype=int)
+        frame = stacked.take(positions).reset_index(drop=True)
+        frame["AE ID"] = np.repeat(ae_ids, sizes[owners])
+        if source in ID_COLUMNS:
+            column = ID_COLUMNS[source]
+            frame[column] = frame[column] + "-" + pd.Series(np.arange(len(frame)), dtype=str)
+        if file_format == "parquet":
+            frame.to_parquet(path / f"{source}.parquet", index=False)
+        else:
+            frame.to_csv(path / f"{source}.csv", index=False)
+    return ae_ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic AE catalogue.")
+    parser.add_argument("ae_count", type=int)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("parquet", "csv"), default="parquet")
+    args = parser.parse_args(argv)
+    generate_dataset(args.path, args.ae_count, args.format)
+    print(f"Wrote {args.ae_count} AEs to {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
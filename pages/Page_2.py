@@ -1,11 +1,28 @@
 import streamlit as st
-import urllib.parse
-import pandas as pd
-import plotly.express as px
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import io
-import base64
+
+# Heavy visualization libraries (plotly, wordcloud, matplotlib) are imported
+# inside the sections that render them, so a cold worker does not pay for them
+# on first page load. benchmarks/import_time.py guards this.
+
+from ae_portal.debug_panel import show_timings
+from ae_portal.delivery import show_table
+from ae_portal.export import EXPORT_FORMATS, export_historical
+from ae_portal.instrumentation import current_profiler, end_profiler, profiling_requested, start_profiler
+from ae_portal.popularity import get_selection_tracker
+from ae_portal.reports import get_report_manager
+from ae_portal.repository import get_repository, refresh_repository
+from ae_portal.results import (
+    SOURCE_TIMEOUTS,
+    build_historical,
+    get_result_cache,
+    historical_count,
+    historical_page,
+)
+from ae_portal.selection import canonical_selection, decode_selection
+from ae_portal.wordclouds import wordcloud_png
+
+HISTORY_PAGE_SIZES = [10, 25, 50, 100]
+RCM_SORT_COLUMNS = ["Risk", "Control", "Business Process", "AE ID"]
 
 # Configure page
 st.set_page_config(
@@ -20,266 +37,298 @@ def get_selected_aes_from_url():
     try:
         # Get query parameters from the URL
         query_params = st.query_params
+        if 's' in query_params:
+            return list(decode_selection(query_params['s']))
+        # Links generated before selection tokens carry one ae= parameter per AE
         selected_aes = query_params.get_all('ae') if 'ae' in query_params else []
         return selected_aes
     except:
         # Fallback to session state if URL parsing fails
         return st.session_state.get('selected_aes', [])
 
-def get_rcm_data(ae_id):
-    """Generate sample RCM data for an AE with Business Process and Test Steps"""
-    data = {
-        "AE-0001": [
-            {
-                "Risk": "Data Privacy Breach",
-                "Control": "Encryption at Rest",
-                "Business Process": "Data Management",
-                "Test Steps": "1. Verify encryption method\n2. Check encryption logs\n3. Validate access restrictions"
-            },
-            {
-                "Risk": "Data Privacy Breach",
-                "Control": "Access Control Matrix",
-                "Business Process": "User Access Management",
-                "Test Steps": "1. Review user roles\n2. Validate access rights\n3. Confirm audit trail"
-            },
-            {
-                "Risk": "Data Privacy Breach",
-                "Control": "Regular Security Audits",
-                "Business Process": "IT Security",
-                "Test Steps": "1. Review past audit reports\n2. Verify follow-up actions\n3. Confirm audit frequency"
-            },
-            {
-                "Risk": "System Downtime",
-                "Control": "Redundant Infrastructure",
-                "Business Process": "IT Operations",
-                "Test Steps": "1. Inspect infrastructure setup\n2. Verify failover testing\n3. Check redundancy logs"
-            },
-            {
-                "Risk": "System Downtime",
-                "Control": "Automated Backup Systems",
-                "Business Process": "Business Continuity",
-                "Test Steps": "1. Test backup restoration\n2. Review backup logs\n3. Validate backup schedule"
-            },
-            {
-                "Risk": "Regulatory Non-compliance",
-                "Control": "Compliance Monitoring Dashboard",
-                "Business Process": "Regulatory Compliance",
-                "Test Steps": "1. Check dashboard settings\n2. Verify data accuracy\n3. Ensure timely updates"
-            },
-            {
-                "Risk": "Regulatory Non-compliance",
-                "Control": "Regular Training Programs",
-                "Business Process": "HR & Compliance",
-                "Test Steps": "1. Review training calendar\n2. Validate attendance logs\n3. Check content compliance"
-            }
-        ],
-        "AE-0002": [
-            {
-                "Risk": "Financial Fraud",
-                "Control": "Multi-level Approval Process",
-                "Business Process": "Accounts Payable",
-                "Test Steps": "1. Review approval hierarchy\n2. Sample transaction audit\n3. Validate segregation of duties"
-            },
-            {
-                "Risk": "Financial Fraud",
-                "Control": "Transaction Monitoring System",
-                "Business Process": "Finance Control",
-                "Test Steps": "1. Check monitoring rules\n2. Review flagged transactions\n3. Validate exception handling"
-            },
-            {
-                "Risk": "Financial Fraud",
-                "Control": "Segregation of Duties",
-                "Business Process": "Financial Governance",
-                "Test Steps": "1. Map roles and responsibilities\n2. Verify conflicting roles\n3. Review override logs"
-            },
-            {
-                "Risk": "Operational Error",
-                "Control": "Automated Error Detection",
-                "Business Process": "Operations QA",
-                "Test Steps": "1. Run error simulation\n2. Check detection alerts\n3. Review resolution workflow"
-            },
-            {
-                "Risk": "Operational Error",
-                "Control": "Quality Assurance Reviews",
-                "Business Process": "Operational Risk",
-                "Test Steps": "1. Check QA sampling process\n2. Review feedback reports\n3. Validate improvement actions"
-            },
-            {
-                "Risk": "Market Risk",
-                "Control": "Portfolio Diversification",
-                "Business Process": "Investment Management",
-                "Test Steps": "1. Analyze portfolio allocation\n2. Review diversification policy\n3. Validate exposure limits"
-            },
-            {
-                "Risk": "Market Risk",
-                "Control": "Real-time Risk Monitoring",
-                "Business Process": "Market Surveillance",
-                "Test Steps": "1. Review risk dashboards\n2. Check alert configurations\n3. Validate data feeds"
-            }
-        ],
-        "AE-0003": [
-            {
-                "Risk": "Cyber Security Attack",
-                "Control": "Firewall Protection",
-                "Business Process": "Network Security",
-                "Test Steps": "1. Review firewall rules\n2. Validate latest updates\n3. Check intrusion logs"
-            },
-            {
-                "Risk": "Cyber Security Attack",
-                "Control": "Intrusion Detection System",
-                "Business Process": "IT Security",
-                "Test Steps": "1. Test detection capabilities\n2. Review incident logs\n3. Confirm escalation protocols"
-            },
-            {
-                "Risk": "Cyber Security Attack",
-                "Control": "Employee Security Training",
-                "Business Process": "HR Training",
-                "Test Steps": "1. Review training frequency\n2. Validate test results\n3. Confirm participation"
-            },
-            {
-                "Risk": "Data Loss",
-                "Control": "Regular Data Backups",
-                "Business Process": "Data Management",
-                "Test Steps": "1. Check backup logs\n2. Validate storage health\n3. Review backup success rate"
-            },
-            {
-                "Risk": "Data Loss",
-                "Control": "Data Recovery Procedures",
-                "Business Process": "Business Continuity",
-                "Test Steps": "1. Test recovery process\n2. Review RTO and RPO\n3. Validate data integrity"
-            },
-            {
-                "Risk": "Third Party Risk",
-                "Control": "Vendor Risk Assessment",
-                "Business Process": "Third Party Management",
-                "Test Steps": "1. Review assessment reports\n2. Validate scoring criteria\n3. Confirm assessment frequency"
-            },
-            {
-                "Risk": "Third Party Risk",
-                "Control": "Contract Management System",
-                "Business Process": "Vendor Governance",
-                "Test Steps": "1. Check contract repository\n2. Validate expiry tracking\n3. Review approval workflows"
-            }
-        ]
-    }
-    return data.get(ae_id, [])
-
-def get_past_issues(ae_id):
-    """Generate sample past issues for word cloud"""
-    issues = {
-        "AE-0001": [
-            "security", "breach", "unauthorized", "access", "data", "privacy", "compliance", 
-            "vulnerability", "incident", "malware", "phishing", "authentication", "encryption",
-            "firewall", "monitoring", "audit", "risk", "control", "governance", "policy"
-        ],
-        "AE-0002": [
-            "fraud", "transaction", "financial", "error", "reconciliation", "approval", 
-            "authorization", "payment", "settlement", "accounting", "reporting", "variance",
-            "investigation", "suspicious", "anomaly", "detection", "verification", "validation"
-        ],
-        "AE-0003": [
-            "attack", "threat", "malicious", "virus", "ransomware", "exploit", "penetration",
-            "hacking", "infiltration", "compromise", "weakness", "patch", "update", "defense",
-            "protection", "isolation", "quarantine", "restoration", "recovery", "backup"
-        ]
-    }
-    return issues.get(ae_id, [])
-
-def get_related_events(ae_id):
-    """Generate sample ORES (Operational Risk Event Summary) data"""
-    events = {
-        "AE-0001": [
-            {"Event ID": "ORE-2024-001", "Date": "2024-12-15", "Description": "Unauthorized access attempt to customer database", "Severity": "High", "Status": "Resolved"},
-            {"Event ID": "ORE-2024-002", "Date": "2024-11-28", "Description": "Data encryption failure in backup system", "Severity": "Medium", "Status": "Investigating"},
-            {"Event ID": "ORE-2024-003", "Date": "2024-10-12", "Description": "Failed compliance audit finding", "Severity": "Medium", "Status": "Resolved"},
-            {"Event ID": "ORE-2024-004", "Date": "2024-09-05", "Description": "Suspicious login activity detected", "Severity": "Low", "Status": "Monitoring"}
-        ],
-        "AE-0002": [
-            {"Event ID": "ORE-2024-005", "Date": "2024-12-20", "Description": "Fraudulent transaction detected and blocked", "Severity": "High", "Status": "Resolved"},
-            {"Event ID": "ORE-2024-006", "Date": "2024-11-15", "Description": "Payment processing error affecting multiple accounts", "Severity": "Medium", "Status": "Resolved"},
-            {"Event ID": "ORE-2024-007", "Date": "2024-10-30", "Description": "Reconciliation discrepancy in monthly reports", "Severity": "Low", "Status": "Closed"},
-            {"Event ID": "ORE-2024-008", "Date": "2024-09-18", "Description": "Unauthorized approval workflow bypass", "Severity": "Medium", "Status": "Investigating"}
-        ],
-        "AE-0003": [
-            {"Event ID": "ORE-2024-009", "Date": "2024-12-10", "Description": "Malware detected in email attachment", "Severity": "High", "Status": "Contained"},
-            {"Event ID": "ORE-2024-010", "Date": "2024-11-22", "Description": "DDoS attack on web services", "Severity": "High", "Status": "Mitigated"},
-            {"Event ID": "ORE-2024-011", "Date": "2024-10-08", "Description": "Suspicious network traffic patterns", "Severity": "Medium", "Status": "Monitoring"},
-            {"Event ID": "ORE-2024-012", "Date": "2024-08-25", "Description": "Failed security patch deployment", "Severity": "Low", "Status": "Resolved"}
-        ]
-    }
-    return events.get(ae_id, [])
-
-def get_related_events(ae_id):
-    """Generate extended ORES (Operational Risk Event Summary) data"""
-    events = {
-        "AE-0001": [
-            {
-                "Event ID": "ORE-2024-001",
-                "Discover Date": "2024-12-15",
-                "Summary": "Unauthorized DB access",
-                "Description": "Unauthorized access attempt to customer database",
-                "Gross Impact on Earnings": 100000,
-                "CAD Equivalent": 135000,
-                "GL Account Code": "610001",
-                "GL Account Description": "Security Breach Expenses"
-            },
-            {
-                "Event ID": "ORE-2024-002",
-                "Discover Date": "2024-11-28",
-                "Summary": "Encryption failure",
-                "Description": "Data encryption failure in backup system",
-                "Gross Impact on Earnings": 50000,
-                "CAD Equivalent": 67500,
-                "GL Account Code": "610002",
-                "GL Account Description": "Data Protection Failures"
-            }
-        ],
-        "AE-0002": [
-            {
-                "Event ID": "ORE-2024-005",
-                "Discover Date": "2024-12-20",
-                "Summary": "Fraud blocked",
-                "Description": "Fraudulent transaction detected and blocked",
-                "Gross Impact on Earnings": 250000,
-                "CAD Equivalent": 337500,
-                "GL Account Code": "620001",
-                "GL Account Description": "Fraud Investigation Costs"
-            },
-            {
-                "Event ID": "ORE-2024-006",
-                "Discover Date": "2024-11-15",
-                "Summary": "Payment error",
-                "Description": "Payment processing error affecting multiple accounts",
-                "Gross Impact on Earnings": 30000,
-                "CAD Equivalent": 40500,
-                "GL Account Code": "620002",
-                "GL Account Description": "Payment Operation Errors"
-            }
-        ],
-        "AE-0003": [
-            {
-                "Event ID": "ORE-2024-009",
-                "Discover Date": "2024-12-10",
-                "Summary": "Malware attack",
-                "Description": "Malware detected in email attachment",
-                "Gross Impact on Earnings": 150000,
-                "CAD Equivalent": 202500,
-                "GL Account Code": "630001",
-                "GL Account Description": "Cybersecurity Breach Handling"
-            },
-            {
-                "Event ID": "ORE-2024-010",
-                "Discover Date": "2024-11-22",
-                "Summary": "DDoS incident",
-                "Description": "DDoS attack on web services",
-                "Gross Impact on Earnings": 120000,
-                "CAD Equivalent": 162000,
-                "GL Account Code": "630002",
-                "GL Account Description": "IT Infrastructure Incident Costs"
-            }
-        ]
-    }
-    return events.get(ae_id, [])
+@st.fragment(run_every=1)
+def show_report_progress(job):
+    """Poll a running report job without rerunning the rest of the page"""
+    if job.done:
+        st.rerun()
+    st.progress(job.progress, text=f"📊 {job.status}...")
+
+
+SOURCE_LABELS = {
+    "rcm": "RCM data",
+    "ores": "related events",
+    "ores_summary": "ORES financial impact",
+    "audits": "prior audits",
+    "issues": "prior issues",
+}
+
+
+@st.fragment(run_every=1)
+def wait_for_source(selected_aes, name):
+    """Poll a slow source and rerun the page once its data has arrived"""
+    if get_result_cache().ready(selected_aes, name):
+        st.rerun()
+
+
+def load_source(selected_aes, name):
+    """Return one shared result frame, or None if it is not ready in time
+
+    Sources are fetched concurrently (see main); a section whose source is
+    slower than SOURCE_TIMEOUTS renders a placeholder instead of holding up
+    the sections after it, and the page reruns when the data arrives.
+    """
+    try:
+        return get_result_cache().source(selected_aes, name, timeout=SOURCE_TIMEOUTS[name])
+    except TimeoutError:
+        st.info(f"⏳ Still loading {SOURCE_LABELS[name]}...")
+        wait_for_source(selected_aes, name)
+    except Exception as e:
+        st.error(f"Could not load {SOURCE_LABELS[name]}: {e}")
+    return None
+
+
+@st.fragment
+def rcm_section(selected_aes):
+    # --- RCM TABLE ---
+    with current_profiler().section("rcm") as section:
+        st.markdown("#### Recommended RCM Table")
+        repository = get_repository()
+        selection = canonical_selection(selected_aes)
+
+        # Filter widgets rerun only this fragment; predicates run in the repository
+        risk_col, process_col, control_col, sort_col = st.columns([2, 2, 2, 1])
+        with risk_col:
+            risks = st.multiselect("Risk", options=repository.distinct_values(selection, "rcm", "Risk"))
+        with process_col:
+            processes = st.multiselect(
+                "Business Process", options=repository.distinct_values(selection, "rcm", "Business Process")
+            )
+        with control_col:
+            control_text = st.text_input("Control contains", placeholder="e.g. backup")
+        with sort_col:
+            sort_by = st.selectbox("Sort by", options=[None] + RCM_SORT_COLUMNS, format_func=lambda c: c or "—")
+            descending = st.toggle("Descending", disabled=sort_by is None)
+
+        if risks or processes or control_text or sort_by:
+            merged_df = repository.query(
+                selection,
+                "rcm",
+                filters={"Risk": risks, "Business Process": processes},
+                contains={"Control": control_text},
+                sort_by=sort_by,
+                ascending=not descending,
+            )
+        else:
+            merged_df = load_source(selected_aes, "rcm")
+            if merged_df is None:
+                return
+
+        if not merged_df.empty:
+            show_table(merged_df, key="rcm")
+        else:
+            st.info("No RCM data available.")
+        section.rows = len(merged_df)
+
+
+@st.fragment
+def wordcloud_section(selected_aes):
+    # --- PAST ISSUE WORD CLOUD ---
+    with current_profiler().section("wordclouds") as section:
+        repository = get_repository()
+        st.markdown("#### Past Issues (Word Cloud)")
+        cloud_columns = st.columns(3)
+        for i, ae in enumerate(selected_aes):
+            with cloud_columns[i % 3]:
+                st.markdown(f"**Past Issues for {ae}:**")
+                wordcloud = wordcloud_png(repository, ae)
+                if wordcloud:
+                    st.image(wordcloud, use_container_width=True)
+                else:
+                    st.info("No past issues found.")
+        section.rows = len(selected_aes)
+
+
+@st.fragment
+def ores_section(selected_aes):
+    # --- RELATED EVENTS TABLE ---
+    with current_profiler().section("ores") as section:
+        st.markdown("#### Related Events (ORES)")
+        events_df = load_source(selected_aes, "ores")
+        if events_df is None:
+            return
+
+        if not events_df.empty:
+            show_table(events_df, key="ores")
+        else:
+            st.info("No related events found.")
+        section.rows = len(events_df)
+
+    # --- ORES FINANCIAL IMPACT ---
+    with current_profiler().section("ores_summary") as section:
+        summary = load_source(selected_aes, "ores_summary")
+        if summary is None:
+            return
+        if summary["event_count"]:
+            st.markdown("#### ORES Financial Impact")
+            metric_cols = st.columns(4)
+            metric_cols[0].metric("Events", f"{summary['event_count']:,}")
+            metric_cols[1].metric("Gross Impact on Earnings", f"{summary['gross_total']:,.0f}")
+            metric_cols[2].metric("CAD Equivalent", f"{summary['cad_total']:,.0f}")
+            metric_cols[3].metric("CAD / Earnings", f"{summary['cad_ratio']:.2f}")
+
+            by_ae_tab, by_gl_tab, by_month_tab, top_tab = st.tabs(
+                ["By AE", "By GL Account", "By Month", f"Top {len(summary['top_events'])} Events"]
+            )
+            with by_ae_tab:
+                st.dataframe(summary["by_ae"], use_container_width=True, hide_index=True)
+            with by_gl_tab:
+                st.dataframe(summary["by_gl"], use_container_width=True, hide_index=True)
+            with by_month_tab:
+                import plotly.express as px
+
+                fig = px.bar(
+                    summary["by_month"],
+                    x="Month",
+                    y=["Gross Impact on Earnings", "CAD Equivalent"],
+                    barmode="group",
+                )
+                st.plotly_chart(fig, use_container_width=True)
+            with top_tab:
+                st.dataframe(summary["top_events"], use_container_width=True, hide_index=True)
+        section.rows = summary["event_count"]
+
+
+@st.fragment
+def audits_section(selected_aes):
+    # --- PRIOR AUDITS TABLE ---
+    with current_profiler().section("audits") as section:
+        st.markdown("#### Prior Audits")
+        audit_df = load_source(selected_aes, "audits")
+        if audit_df is None:
+            return
+
+        if not audit_df.empty:
+            show_table(audit_df, key="audits")
+        else:
+            st.info("No prior audit records found.")
+        section.rows = len(audit_df)
+
+
+@st.fragment
+def issues_section(selected_aes):
+    # --- PRIOR ISSUES TABLE ---
+    with current_profiler().section("issues") as section:
+        st.markdown("#### Prior Issues")
+        issues_df = load_source(selected_aes, "issues")
+        if issues_df is None:
+            return
+
+        if not issues_df.empty:
+            show_table(issues_df, key="issues")
+        else:
+            st.info("No prior issues found.")
+        section.rows = len(issues_df)
+
+
+@st.fragment
+def historical_section(selected_aes):
+    # --- HISTORICAL DATA (CONSOLIDATED) ---
+    # Paging and export widgets rerun only this fragment
+    with current_profiler().section("historical") as section:
+        st.markdown("#### 🗃️ Historical Data (Consolidated View)")
+
+        repository = get_repository()
+        selection = canonical_selection(selected_aes)
+        total_rows = historical_count(repository, selection)
+
+        if total_rows:
+            # Only the rows on the requested page are fetched from the data layer
+            size_col, page_col, info_col = st.columns([1, 1, 2])
+            with size_col:
+                page_size = st.selectbox("Rows per page", options=HISTORY_PAGE_SIZES)
+            page_count = max(1, -(-total_rows // page_size))
+            with page_col:
+                page_number = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1)
+            offset = (page_number - 1) * page_size
+            page_df = historical_page(repository, selection, offset=offset, limit=page_size)
+            with info_col:
+                st.markdown("<br>", unsafe_allow_html=True)
+                st.caption(f"Rows {offset + 1}–{offset + len(page_df)} of {total_rows} (page {page_number} of {page_count})")
+            show_table(
+                page_df,
+                key="historical",
+                column_config={
+                    "Date": st.column_config.DateColumn("Date", format="YYYY-MM-DD"),
+                    "Reporting Year": st.column_config.NumberColumn("Reporting Year", format="%d"),
+                    "Amount": st.column_config.NumberColumn("Amount", format="%,.0f"),
+                },
+            )
+
+            # Export is built lazily, only when the user asks for it
+            export_col, prepare_col = st.columns([2, 1])
+            with export_col:
+                export_format = st.selectbox(
+                    "Export format",
+                    options=list(EXPORT_FORMATS),
+                    help="CSV and Parquet are much faster to build than Excel for large selections",
+                )
+            export_key = (selection, repository.version, export_format)
+            with prepare_col:
+                st.markdown("<br>", unsafe_allow_html=True)
+                if st.button("⚙️ Prepare Download", use_container_width=True):
+                    with st.spinner(f"Building {export_format} export..."):
+                        hist_df = build_historical(repository, selection)
+                        st.session_state.historical_export = (
+                            export_key,
+                            export_historical(get_result_cache().get(selected_aes), hist_df, export_format),
+                        )
+
+            prepared = st.session_state.get("historical_export")
+            if prepared and prepared[0] == export_key:
+                data, file_name, mime = prepared[1]
+                st.download_button(
+                    label=f"📥 Download Full Historical Data ({export_format})",
+                    data=data,
+                    file_name=file_name,
+                    mime=mime
+                )
+        else:
+            st.info("No historical data available.")
+        section.rows = total_rows
+
+
+@st.fragment
+def actions_section(selected_aes):
+    # --- Action Buttons ---
+    st.markdown("---")
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        if st.button("🔙 Back to Selection", use_container_width=True):
+            st.switch_page("Home.py")
+    with col2:
+        if st.button("📊 Generate Report", use_container_width=True):
+            st.session_state.report_selection = get_report_manager().submit(selected_aes).selection
+    if st.session_state.get("report_selection") == canonical_selection(selected_aes):
+        show_report_status(selected_aes)
+
+
+def show_report_status(selected_aes):
+    """Show progress of the background report job, then offer the file"""
+    job = get_report_manager().get(selected_aes)
+    if job is None:
+        return
+    if not job.done:
+        show_report_progress(job)
+    elif job.error:
+        st.error(f"Report generation failed: {job.error}")
+    else:
+        st.download_button(
+            label="📥 Download Report (HTML)",
+            data=job.artifact,
+            file_name=job.file_name,
+            mime="text/html",
+            use_container_width=True
+        )
 
 
 def main():
@@ -287,14 +336,33 @@ def main():
     st.title("📋 Selected AE Details")
     st.markdown("---")
     
+    profiler = start_profiler("Page_2", profiling_requested(st.query_params))
+    refresh_repository()
+    st.sidebar.toggle(
+        "Compact tables",
+        value=True,
+        key="compact_tables",
+        help="Send only the visible columns, with long text truncated; select a row to see it in full",
+    )
+
     # Get selected AEs from URL or session state
     selected_aes = get_selected_aes_from_url()
+    if selected_aes and st.session_state.get("recorded_selection") != selected_aes:
+        # Count each scanned/linked selection once per session; the tracker only
+        # touches memory here and writes the counts prewarm reads in batches
+        get_selection_tracker().record(selected_aes)
+        st.session_state.recorded_selection = selected_aes
     
     # Also check session state (for when navigating via sidebar)
     if not selected_aes and 'selected_aes' in st.session_state:
         selected_aes = st.session_state.selected_aes
     
     if selected_aes:
+        with profiler.section("result_set"):
+            # Start fetching every source at once; each section then waits only for
+            # its own source, and frames are shared across sessions via the cache
+            get_result_cache().prefetch(selected_aes)
+
         st.markdown("### 🎯 You have selected the following AE IDs:")
         for i, ae in enumerate(selected_aes, 1):
             with st.container():
@@ -326,203 +394,14 @@ def main():
             unsafe_allow_html=True
         )
 
-        # --- RCM TABLE ---
-        st.markdown("#### Recommended RCM Table")
-        all_rcm_records = []
-
-        for ae in selected_aes:
-            rcm_data = get_rcm_data(ae)
-            for record in rcm_data:
-                record_with_ae = record.copy()
-                record_with_ae["AE ID"] = ae  # add AE ID to identify the source
-                all_rcm_records.append(record_with_ae)
-
-        if all_rcm_records:
-            merged_df = pd.DataFrame(all_rcm_records)
-            st.dataframe(merged_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No RCM data available.")
-
-        # --- PAST ISSUE WORD CLOUD ---
-        # st.markdown("#### Past Issues (Word Cloud)")
-        # for ae in selected_aes:
-        #     st.markdown(f"**Past Issues for {ae}:**")
-        #     issues = get_past_issues(ae)
-        #     if issues:
-        #         text = " ".join(issues * 10)  # repeat for better word cloud
-        #         wc = WordCloud(width=600, height=300, background_color='white').generate(text)
-        #         fig, ax = plt.subplots(figsize=(8, 4))
-        #         ax.imshow(wc, interpolation='bilinear')
-        #         ax.axis('off')
-        #         st.pyplot(fig)
-        #     else:
-        #         st.info("No past issues found.")
-
-        # --- RELATED EVENTS TABLE ---
-        # st.markdown("#### Related Events (ORES)")
-        # for ae in selected_aes:
-        #     st.markdown(f"**Related Events for {ae}:**")
-        #     events = get_related_events(ae)
-        #     if events:
-        #         df = pd.DataFrame(events)
-        #         st.dataframe(df, use_container_width=True, hide_index=True)
-        #     else:
-        #         st.info("No related events found.")
-
-
-        # with col3:
-            # if st.button("📤 Export Data", use_container_width=True):
-            #     export_data = "\n".join([f"- {ae}" for ae in selected_aes])
-            #     st.download_button(
-            #         label="Download as TXT",
-            #         data=export_data,
-            #         file_name="selected_aes.txt",
-            #         mime="text/plain"
-            #     )
-        st.markdown("#### Related Events (ORES)")
-        all_events = []
-
-        for ae in selected_aes:
-            events = get_related_events(ae)
-            for event in events:
-                event_with_ae = event.copy()
-                event_with_ae["AE ID"] = ae
-                all_events.append(event_with_ae)
-
-        if all_events:
-            events_df = pd.DataFrame(all_events)
-            st.dataframe(events_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No related events found.")
-
-        # --- PRIOR AUDITS TABLE ---
-        st.markdown("#### Prior Audits")
-        all_audits = []
-
-        # Simulated inline audit data
-        audit_data = {
-            "AE-0001": [
-                {"Audit ID": "AUD-2021-001", "Audit Title": "Data Privacy Controls", "Engagement Type": "Internal", "Audit Status": "Closed", "Audit Reporting Year": 2021},
-                {"Audit ID": "AUD-2022-002", "Audit Title": "Cloud Security Review", "Engagement Type": "External", "Audit Status": "Closed", "Audit Reporting Year": 2022}
-            ],
-            "AE-0002": [
-                {"Audit ID": "AUD-2020-003", "Audit Title": "Finance Compliance Audit", "Engagement Type": "Internal", "Audit Status": "Closed", "Audit Reporting Year": 2020},
-                {"Audit ID": "AUD-2023-004", "Audit Title": "Payment Controls Review", "Engagement Type": "External", "Audit Status": "In Progress", "Audit Reporting Year": 2023}
-            ],
-            "AE-0003": [
-                {"Audit ID": "AUD-2021-005", "Audit Title": "Cybersecurity Framework", "Engagement Type": "Internal", "Audit Status": "Closed", "Audit Reporting Year": 2021},
-                {"Audit ID": "AUD-2022-006", "Audit Title": "Third Party Vendor Risk", "Engagement Type": "External", "Audit Status": "Closed", "Audit Reporting Year": 2022}
-            ]
-        }
-
-        for ae in selected_aes:
-            for audit in audit_data.get(ae, []):
-                audit["AE ID"] = ae
-                all_audits.append(audit)
-
-        if all_audits:
-            audit_df = pd.DataFrame(all_audits)
-            st.dataframe(audit_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No prior audit records found.")
-
-            # --- PRIOR ISSUES TABLE ---
-        st.markdown("#### Prior Issues")
-        all_issues = []
-
-        # Simulated inline prior issue data
-        issue_data = {
-            "AE-0001": [
-                {"Issue ID": "ISS-2021-001", "Issue Title": "Unencrypted backups found", "Issue Rating (1-5)": 4, "Audit Reporting Year": 2021},
-                {"Issue ID": "ISS-2022-002", "Issue Title": "Access control gaps", "Issue Rating (1-5)": 3, "Audit Reporting Year": 2022}
-            ],
-            "AE-0002": [
-                {"Issue ID": "ISS-2020-003", "Issue Title": "Transaction override logging missing", "Issue Rating (1-5)": 5, "Audit Reporting Year": 2020},
-                {"Issue ID": "ISS-2023-004", "Issue Title": "Approval process inconsistent", "Issue Rating (1-5)": 2, "Audit Reporting Year": 2023}
-            ],
-            "AE-0003": [
-                {"Issue ID": "ISS-2021-005", "Issue Title": "Outdated antivirus signatures", "Issue Rating (1-5)": 4, "Audit Reporting Year": 2021},
-                {"Issue ID": "ISS-2022-006", "Issue Title": "Vendor risk documentation missing", "Issue Rating (1-5)": 3, "Audit Reporting Year": 2022}
-            ]
-        }
-
-        for ae in selected_aes:
-            for issue in issue_data.get(ae, []):
-                issue["AE ID"] = ae
-                all_issues.append(issue)
-
-        if all_issues:
-            issues_df = pd.DataFrame(all_issues)
-            st.dataframe(issues_df, use_container_width=True, hide_index=True)
-        else:
-            st.info("No prior issues found.")
-        # --- HISTORICAL DATA (CONSOLIDATED) ---
-        st.markdown("#### 🗃️ Historical Data (Consolidated View)")
-
-        # Gather all data types with a tag for type
-        historical_data = []
-
-        # Add RCM
-        for ae in selected_aes:
-            for row in get_rcm_data(ae):
-                record = row.copy()
-                record["AE ID"] = ae
-                record["Source Type"] = "RCM"
-                historical_data.append(record)
-
-        # Add Related Events
-        for ae in selected_aes:
-            for row in get_related_events(ae):
-                record = row.copy()
-                record["AE ID"] = ae
-                record["Source Type"] = "Related Event"
-                historical_data.append(record)
-
-        # Add Prior Audits
-        for ae in selected_aes:
-            for row in audit_data.get(ae, []):
-                record = row.copy()
-                record["AE ID"] = ae
-                record["Source Type"] = "Prior Audit"
-                historical_data.append(record)
-
-        # # Add Prior Issues
-        # for ae in selected_aes:
-        #     for row in issue_data.get(ae, []):
-        #         record = row.copy()
-        #         record["AE ID"] = ae
-        #         record["Source Type"] = "Prior Issue"
-        #         historical_data.append(record)
-
-        # Display 10 rows only
-        if historical_data:
-            hist_df = pd.DataFrame(historical_data)
-            st.dataframe(hist_df.head(10), use_container_width=True, hide_index=True)
-
-            # Excel export
-            to_excel = io.BytesIO()
-            # with pd.ExcelWriter(to_excel, engine='xlsxwriter') as writer:
-            #     hist_df.to_excel(writer, index=False, sheet_name='Historical Data')
-            # to_excel.seek(0)
-
-            st.download_button(
-                label="📥 Download Full Historical Data (Excel)",
-                data=to_excel,
-                file_name="historical_data.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        else:
-            st.info("No historical data available.")
-
-        # --- Action Buttons ---
-        st.markdown("---")
-        col1, col2, col3 = st.columns([1, 1, 1])
-        with col1:
-            if st.button("🔙 Back to Selection", use_container_width=True):
-                st.switch_page("Home.py")
-        with col2:
-            if st.button("📊 Generate Report", use_container_width=True):
-                st.info("Report generation feature coming soon!")
+        # Each section is a fragment: widgets inside one section rerun only that section
+        rcm_section(selected_aes)
+        wordcloud_section(selected_aes)
+        ores_section(selected_aes)
+        audits_section(selected_aes)
+        issues_section(selected_aes)
+        historical_section(selected_aes)
+        actions_section(selected_aes)
 
     else:
         st.warning("⚠️ No AE IDs were found!")
@@ -530,9 +409,16 @@ def main():
         st.markdown("- You navigated directly to this page without scanning a QR code")
         st.markdown("- The QR code data was not properly transmitted")
         st.markdown("- The URL parameters were cleared")
+        st.markdown("- The QR code was generated by a server that does not share this one's selection store")
         st.markdown("---")
         if st.button("🔙 Go to AE Selection Page", use_container_width=True):
             st.switch_page("Home.py")
 
+    if profiler.enabled:
+        show_timings(profiler.finish())
+
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    finally:
+        end_profiler()
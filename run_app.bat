@@ -1,5 +1,6 @@
 # Install required packages
 pip install -r requirements.txt
 
-# Run the Streamlit application
-streamlit run Home.py
+# Prewarm the data and caches, then run the Streamlit application
+# (plain `streamlit run Home.py` also works, without the prewarm)
+python -m ae_portal.prewarm
@@ -0,0 +1,86 @@
+"""Cross-session isolation of the shared Page_2 result frames
+
+Result sets are built once and shared by every session (ae_portal/results.py).
+Each test plays sessions against one cached entry: every session tries one
+kind of in-place edit on its frame, and the next session must still see
+exactly what a fresh build returns.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from ae_portal.repository import FileRepository
+from ae_portal.results import ResultCache, build_result_set
+
+REPOSITORY = FileRepository()
+
+SELECTIONS = {
+    "first-two": tuple(REPOSITORY.ae_ids()[:2]),
+    "every-other": tuple(REPOSITORY.ae_ids()[::2]),
+}
+
+
+def frames_of(result):
+    for name, value in result.items():
+        if isinstance(value, dict):
+            yield from ((f"{name}.{inner}", frame) for inner, frame in frames_of(value))
+        elif isinstance(value, pd.DataFrame):
+            yield name, value
+
+
+def edits(frame):
+    """Yield (name, edit) for every kind of in-place edit of frame's columns; edit(frame) applies it"""
+    for position, column in enumerate(frame.columns):
+        yield f"iloc {column}", lambda target, position=position: target.iloc.__setitem__(
+            (0, position), target.iloc[-1, position]
+        )
+        yield f"array {column}", lambda target, column=column: target[column].to_numpy().__setitem__(0, None)
+    yield "add column", lambda target: target.__setitem__("Tampered", 1)
+    yield "drop column", lambda target: target.drop(columns=target.columns[0], inplace=True)
+
+
+def leaked_edits(cache, selection, name, expected):
+    """Apply each edit to a fresh session view of frame name; return those another session then sees
+
+    An edit that is not rejected may still be harmless: it can land on a
+    temporary copy (e.g. to_numpy() of a categorical) or on the session's own
+    shallow copy (adding or dropping a column). Only edits that change what
+    the next session is served count.
+    """
+    leaked = []
+    for edit_name, edit in edits(expected):
+        session = dict(frames_of(cache.get(selection)))[name]
+        if session.empty:
+            return leaked
+        try:
+            edit(session)
+        except (ValueError, TypeError, AssertionError):
+            continue
+        if not dict(frames_of(cache.get(selection)))[name].equals(expected):
+            leaked.append(edit_name)
+    return leaked
+
+
+@pytest.fixture(scope="module")
+def cache():
+    return ResultCache(REPOSITORY)
+
+
+# (selection, frame name, frame as a fresh build returns it) for every shared frame
+CASES = {
+    f"{label}-{name}": (selection, name, frame)
+    for label, selection in SELECTIONS.items()
+    for name, frame in frames_of(build_result_set(REPOSITORY, selection))
+}
+
+
+@pytest.mark.parametrize(("selection", "name", "expected"), CASES.values(), ids=CASES.keys())
+def test_session_edits_do_not_leak(cache, selection, name, expected):
+    assert leaked_edits(cache, selection, name, expected) == []
+
+
+def test_contiguous_selection_is_a_view():
+    # A run of neighbouring AEs is one row range, so it must not be copied
+    contiguous = REPOSITORY.rows_for(REPOSITORY.ae_ids()[:2], "rcm")
+    stored = REPOSITORY.rows_for(REPOSITORY.ae_ids(), "rcm")
+    assert np.shares_memory(contiguous["Control"].to_numpy(), stored["Control"].to_numpy())
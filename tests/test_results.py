@@ -0,0 +1,88 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pytest
+
+from ae_portal.repository import FileRepository
+from ae_portal.results import RESULT_SOURCES, ResultCache
+
+SELECTION = ("AE-0001", "AE-0003")
+
+
+class CountingRepository:
+    """Delegates to a repository, counting rows_for calls and failing while down is set"""
+
+    def __init__(self, repository, release=None):
+        self.repository = repository
+        self.release = release
+        self.down = False
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def rows_for(self, ae_ids, source, offset=0, limit=None):
+        with self._lock:
+            self.calls += 1
+        if self.release is not None:
+            self.release.wait(5)
+        if self.down:
+            raise RuntimeError("backend down")
+        return self.repository.rows_for(ae_ids, source, offset=offset, limit=limit)
+
+    def __getattr__(self, name):
+        return getattr(self.repository, name)
+
+
+class SynchronousExecutor:
+    """Runs every submitted call before submit() returns"""
+
+    def submit(self, function, *args):
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except BaseException as error:
+            future.set_exception(error)
+        return future
+
+
+@pytest.fixture
+def repository():
+    return FileRepository("data")
+
+
+def test_concurrent_misses_share_one_fetch(repository):
+    release = threading.Event()
+    counting = CountingRepository(repository, release)
+    cache = ResultCache(counting, executor=ThreadPoolExecutor(len(RESULT_SOURCES)))
+    sessions = 8
+    barrier = threading.Barrier(sessions)
+
+    def session(_index):
+        barrier.wait()
+        return cache.get(SELECTION)
+
+    with ThreadPoolExecutor(sessions) as pool:
+        results = [pool.submit(session, index) for index in range(sessions)]
+        # Hold the fetch until every session has looked the selection up
+        while cache.stats()["hits"] + cache.stats()["misses"] < sessions:
+            time.sleep(0.01)
+        release.set()
+        for result in results:
+            assert set(result.result()["ores"]["AE ID"]) <= set(SELECTION)
+
+    assert counting.calls == len(RESULT_SOURCES)
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["hits"] == sessions - 1
+
+
+def test_fast_failure_is_not_cached(repository):
+    counting = CountingRepository(repository)
+    cache = ResultCache(counting, executor=SynchronousExecutor())
+    counting.down = True
+    with pytest.raises(RuntimeError, match="backend down"):
+        cache.get(SELECTION)
+    assert cache.stats()["entries"] == 0
+
+    counting.down = False
+    assert not cache.get(SELECTION)["rcm"].empty
+    assert cache.stats()["misses"] == 2
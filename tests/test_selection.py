@@ -0,0 +1,124 @@
+import random
+import zlib
+
+import pytest
+
+from ae_portal.selection import (
+    INLINE_MARKER,
+    MAX_INLINE_BODY_BYTES,
+    MAX_INLINE_TOKEN_LENGTH,
+    MAX_SELECTION_SIZE,
+    STORED_MARKER,
+    SelectionStore,
+    _BITSET,
+    _COMPRESSED,
+    _DELTA,
+    _b64decode,
+    _b64encode,
+    _varint,
+    decode_selection,
+    encode_selection,
+    inline_obstacle,
+)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SelectionStore(tmp_path / "selections.sqlite")
+
+
+def inline_mode(token):
+    return _b64decode(token[len(INLINE_MARKER):])[0] & ~_COMPRESSED
+
+
+def test_sparse_selection_is_inline_delta(store):
+    selection = ("AE-0003", "AE-0170", "AE-0999")
+    token = encode_selection(selection, store)
+    assert token.startswith(INLINE_MARKER)
+    assert inline_mode(token) == _DELTA
+    assert decode_selection(token, store) == selection
+
+
+def test_dense_selection_is_inline_bitset(store):
+    selection = tuple(f"AE-{number:04d}" for number in range(100, 180) if number % 3)
+    token = encode_selection(selection, store)
+    assert token.startswith(INLINE_MARKER)
+    assert inline_mode(token) == _BITSET
+    assert decode_selection(token, store) == selection
+
+
+def test_selection_is_canonicalized(store):
+    token = encode_selection(["AE-0002", "AE-0001", "AE-0002"], store)
+    assert token == encode_selection(["AE-0001", "AE-0002"], store)
+    assert decode_selection(token, store) == ("AE-0001", "AE-0002")
+
+
+@pytest.mark.parametrize(
+    "selection",
+    [
+        ("alpha", "beta"),
+        ("AE-1", "AE-0002"),
+        tuple(f"AE-{number:05d}" for number in random.Random(0).sample(range(100_000), 150)),
+    ],
+    ids=["non-numeric", "mixed-width", "over-budget"],
+)
+def test_other_selections_are_stored(store, selection):
+    token = encode_selection(selection, store)
+    assert token.startswith(STORED_MARKER)
+    assert len(token) < MAX_INLINE_TOKEN_LENGTH
+    assert decode_selection(token, store) == tuple(sorted(selection))
+
+
+def test_stored_selection_survives_a_new_store(tmp_path, store):
+    token = encode_selection(("alpha", "beta"), store)
+    assert encode_selection(("beta", "alpha"), store) == token
+    assert decode_selection(token, SelectionStore(tmp_path / "selections.sqlite")) == ("alpha", "beta")
+
+
+@pytest.mark.parametrize("token", ["", "x", "1", "1!!!", "1AAAA", "1" + "A" * 40, "~", "~unknownkey"])
+def test_invalid_tokens_decode_to_empty(store, token):
+    assert decode_selection(token, store) == ()
+
+
+def inline_token(mode, numbers_body, compress=False):
+    body = _varint(3) + b"AE-" + _varint(4) + numbers_body
+    if compress:
+        return INLINE_MARKER + _b64encode(bytes([mode | _COMPRESSED]) + zlib.compress(body, 9))
+    return INLINE_MARKER + _b64encode(bytes([mode]) + body)
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        inline_token(_DELTA, _varint(MAX_SELECTION_SIZE + 1) + b"\0" * (MAX_SELECTION_SIZE + 1), compress=True),
+        inline_token(_BITSET, _varint(0) + _varint(MAX_SELECTION_SIZE + 8) + b"\xff" * (MAX_SELECTION_SIZE // 8 + 1), compress=True),
+        inline_token(_BITSET, _varint(1) + _varint(8) + b"\x01" + b"\0" * MAX_INLINE_BODY_BYTES, compress=True),
+    ],
+    ids=["delta-count", "bitset-span", "decompression-bomb"],
+)
+def test_oversized_inline_tokens_decode_to_empty(store, token):
+    assert decode_selection(token, store) == ()
+
+
+def test_largest_selection_round_trips(store):
+    selection = tuple(f"AE-{number:06d}" for number in range(MAX_SELECTION_SIZE))
+    token = encode_selection(selection, store)
+    assert token.startswith(INLINE_MARKER)
+    assert decode_selection(token, store) == selection
+
+
+@pytest.mark.parametrize(
+    ("selection", "obstacle"),
+    [
+        (("AE-0001", "AE-0003"), None),
+        (("alpha", "beta"), "not one prefix"),
+        (("AE-1", "AE-0002"), "not one prefix"),
+        (tuple(f"AE-{number:05d}" for number in random.Random(0).sample(range(100_000), 150)), "MAX_INLINE_TOKEN_LENGTH"),
+    ],
+    ids=["inline", "non-numeric", "mixed-width", "over-budget"],
+)
+def test_inline_obstacle_names_the_reason(selection, obstacle):
+    if obstacle is None:
+        assert inline_obstacle(selection) is None
+    else:
+        assert obstacle in inline_obstacle(selection)